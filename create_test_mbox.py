@@ -3,101 +3,108 @@
 Generate sample mbox file for testing mbox_email_parser.py
 """
 
-import mailbox
 import email
+import time
+from email.generator import BytesGenerator
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 
-def create_test_mbox(filename='test_emails.mbox'):
-    """Create a test mbox file with sample emails."""
-    
-    mbox = mailbox.mbox(filename)
-    
-    # Test email 1: Simple vacation Czech
-    msg1 = MIMEText('Dobrý den,\n\nJsem na dovolené do 31.8. V případě potřeby kontaktujte kolegu.\n\nDěkuji', 'plain', 'utf-8')
-    msg1['From'] = 'Jan Novák <jan.novak@firma.cz>'
-    msg1['To'] = 'team@firma.cz'
-    msg1['Subject'] = 'Dovolená'
-    msg1['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=10)).timestamp(), localtime=True)
-    msg1['Message-ID'] = '<abc123@server.com>'
-    mbox.add(msg1)
-    
-    # Test email 2: OOO English
-    msg2 = MIMEText('Hi,\n\nI am out of office until Monday. For urgent matters contact my colleague.\n\nBest regards', 'plain', 'utf-8')
-    msg2['From'] = 'Jane Smith <jane.smith@company.com>'
-    msg2['To'] = 'jan.novak@firma.cz'
-    msg2['Subject'] = 'Out of Office'
-    msg2['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=5)).timestamp(), localtime=True)
-    msg2['Message-ID'] = '<xyz456@server.com>'
-    mbox.add(msg2)
-    
-    # Test email 3: Sick leave
-    msg3 = MIMEText('Dobrý den,\n\nJsem na nemocenské od dneška. Vrátím se příští týden.\n\nS pozdravem', 'plain', 'utf-8')
-    msg3['From'] = 'Petr Svoboda <petr.svoboda@firma.cz>'
-    msg3['To'] = 'jan.novak@firma.cz, marie.nova@firma.cz'
-    msg3['Subject'] = 'Nemocenská'
-    msg3['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=3)).timestamp(), localtime=True)
-    msg3['Message-ID'] = '<def789@server.com>'
-    mbox.add(msg3)
+def mk(subject, from_, to, body, message_id, charset='utf-8', days_ago=0, html=None, cc=None):
+    """
+    Build a test message with the common headers.
     
-    # Test email 4: No vacation - should NOT match
-    msg4 = MIMEText('Ahoj,\n\nMohl bys mi poslat tu zprávu? Potřebuji ji na schůzku zítra.\n\nDíky', 'plain', 'utf-8')
-    msg4['From'] = 'Karel Vomacka <karel@firma.cz>'
-    msg4['To'] = 'jan.novak@firma.cz'
-    msg4['Subject'] = 'Dotaz na zprávu'
-    msg4['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=1)).timestamp(), localtime=True)
-    msg4['Message-ID'] = '<ghi012@server.com>'
-    mbox.add(msg4)
+    Args:
+        subject: Subject header
+        from_: From header
+        to: To header
+        body: Plain text body
+        message_id: Message-ID header
+        charset: Body charset
+        days_ago: Age of the message (Date header)
+        html: Optional HTML alternative (creates multipart/alternative)
+        cc: Optional Cc header
     
-    # Test email 5: HTML email with vacation
-    msg5 = MIMEMultipart('alternative')
-    msg5['From'] = 'Marie Nová <marie.nova@firma.cz>'
-    msg5['To'] = 'jan.novak@firma.cz'
-    msg5['Cc'] = 'team@firma.cz'
-    msg5['Subject'] = 'Automatická odpověď: mimo kancelář'
-    msg5['Date'] = email.utils.formatdate(datetime.now().timestamp(), localtime=True)
-    msg5['Message-ID'] = '<jkl345@server.com>'
+    Returns:
+        email.message.Message object
+    """
+    if html is None:
+        msg = MIMEText(body, 'plain', charset)
+    else:
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(body, 'plain', charset))
+        msg.attach(MIMEText(html, 'html', charset))
     
-    text_part = MIMEText('Jsem mimo kancelář. Vrátím se za týden.', 'plain', 'utf-8')
-    html_part = MIMEText('<html><body><p>Jsem <b>mimo kancelář</b>. Vrátím se za týden.</p></body></html>', 'html', 'utf-8')
-    
-    msg5.attach(text_part)
-    msg5.attach(html_part)
-    mbox.add(msg5)
-    
-    # Test email 6: Forward with vacation info (FYI use case)
-    msg6 = MIMEText('---------- Forwarded message ---------\nFrom: Someone\nSubject: Dovolená\n\nJsem na dovolené do konce měsíce.', 'plain', 'utf-8')
-    msg6['From'] = 'Anna Tesarova <anna@firma.cz>'
-    msg6['To'] = 'jan.novak@firma.cz'
-    msg6['Subject'] = 'FW: Info o dovolené'
-    msg6['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=2)).timestamp(), localtime=True)
-    msg6['Message-ID'] = '<mno678@server.com>'
-    mbox.add(msg6)
-    
-    # Test email 7: Not involving target email - should NOT match even if has keywords
-    msg7 = MIMEText('Chceš jít na dovolenou společně?', 'plain', 'utf-8')
-    msg7['From'] = 'random@other.com'
-    msg7['To'] = 'someone@other.com'
-    msg7['Subject'] = 'Dovolená plány'
-    msg7['Date'] = email.utils.formatdate(datetime.now().timestamp(), localtime=True)
-    msg7['Message-ID'] = '<pqr901@server.com>'
-    mbox.add(msg7)
+    msg['From'] = from_
+    msg['To'] = to
+    if cc:
+        msg['Cc'] = cc
+    msg['Subject'] = subject
+    msg['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=days_ago)).timestamp(), localtime=True)
+    msg['Message-ID'] = message_id
+    return msg
+
+def create_test_mbox(filename='test_emails.mbox'):
+    """Create a test mbox file with sample emails."""
     
-    # Test email 8: Czech charset (windows-1250)
-    msg8 = MIMEText('Zdravím,\n\nČerpám řádnou dovolenou do 15.9.\n\nS pozdravem', 'plain', 'windows-1250')
-    msg8['From'] = 'Tomáš Dvořák <tomas.dvorak@firma.cz>'
-    msg8['To'] = 'jan.novak@firma.cz'
-    msg8['Subject'] = 'Řádná dovolená'
-    msg8['Date'] = email.utils.formatdate((datetime.now() - timedelta(days=7)).timestamp(), localtime=True)
-    msg8['Message-ID'] = '<stu234@server.com>'
-    mbox.add(msg8)
+    messages = [
+        # Test email 1: Simple vacation Czech
+        mk('Dovolená', 'Jan Novák <jan.novak@firma.cz>', 'team@firma.cz',
+           'Dobrý den,\n\nJsem na dovolené do 31.8. V případě potřeby kontaktujte kolegu.\n\nDěkuji',
+           '<abc123@server.com>', days_ago=10),
+        
+        # Test email 2: OOO English
+        mk('Out of Office', 'Jane Smith <jane.smith@company.com>', 'jan.novak@firma.cz',
+           'Hi,\n\nI am out of office until Monday. For urgent matters contact my colleague.\n\nBest regards',
+           '<xyz456@server.com>', days_ago=5),
+        
+        # Test email 3: Sick leave
+        mk('Nemocenská', 'Petr Svoboda <petr.svoboda@firma.cz>', 'jan.novak@firma.cz, marie.nova@firma.cz',
+           'Dobrý den,\n\nJsem na nemocenské od dneška. Vrátím se příští týden.\n\nS pozdravem',
+           '<def789@server.com>', days_ago=3),
+        
+        # Test email 4: No vacation - should NOT match
+        mk('Dotaz na zprávu', 'Karel Vomacka <karel@firma.cz>', 'jan.novak@firma.cz',
+           'Ahoj,\n\nMohl bys mi poslat tu zprávu? Potřebuji ji na schůzku zítra.\n\nDíky',
+           '<ghi012@server.com>', days_ago=1),
+        
+        # Test email 5: HTML email with vacation
+        mk('Automatická odpověď: mimo kancelář', 'Marie Nová <marie.nova@firma.cz>', 'jan.novak@firma.cz',
+           'Jsem mimo kancelář. Vrátím se za týden.',
+           '<jkl345@server.com>', cc='team@firma.cz',
+           html='<html><body><p>Jsem <b>mimo kancelář</b>. Vrátím se za týden.</p></body></html>'),
+        
+        # Test email 6: Forward with vacation info (FYI use case)
+        mk('FW: Info o dovolené', 'Anna Tesarova <anna@firma.cz>', 'jan.novak@firma.cz',
+           '---------- Forwarded message ---------\nFrom: Someone\nSubject: Dovolená\n\nJsem na dovolené do konce měsíce.',
+           '<mno678@server.com>', days_ago=2),
+        
+        # Test email 7: Not involving target email - should NOT match even if has keywords
+        mk('Dovolená plány', 'random@other.com', 'someone@other.com',
+           'Chceš jít na dovolenou společně?',
+           '<pqr901@server.com>'),
+        
+        # Test email 8: Czech charset (windows-1250)
+        mk('Řádná dovolená', 'Tomáš Dvořák <tomas.dvorak@firma.cz>', 'jan.novak@firma.cz',
+           'Zdravím,\n\nČerpám řádnou dovolenou do 15.9.\n\nS pozdravem',
+           '<stu234@server.com>', charset='windows-1250', days_ago=7),
+        
+        # Test email 9: Non-breaking spaces (as left by HTML &nbsp;) inside the phrase
+        mk('Status', 'Eva Kralova <eva.kralova@firma.cz>', 'jan.novak@firma.cz',
+           'Hi,\n\nI am out\u00a0of\u00a0office this week.\n\nEva',
+           '<vwx567@server.com>', days_ago=4),
+    ]
     
-    mbox.close()
+    # Write mbox directly (From_ separator + body with ">From " escaping)
+    with open(filename, 'wb') as out:
+        for msg in messages:
+            out.write(b'From MAILER-DAEMON ' + time.asctime(time.gmtime()).encode() + b'\n')
+            BytesGenerator(out, mangle_from_=True).flatten(msg)
+            out.write(b'\n')
     
     print(f"[✓] Created test mbox: {filename}")
-    print(f"[✓] Total emails: 8")
-    print(f"[✓] Expected matches for jan.novak@firma.cz: 6")
+    print(f"[✓] Total emails: {len(messages)}")
+    print(f"[✓] Expected matches for jan.novak@firma.cz: 7")
     print(f"    - Email 1: Dovolená (from jan.novak)")
     print(f"    - Email 2: Out of office (to jan.novak)")
     print(f"    - Email 3: Nemocenská (to jan.novak)")
@@ -106,6 +113,7 @@ def create_test_mbox(filename='test_emails.mbox'):
     print(f"    - Email 6: FW with vacation (to jan.novak)")
     print(f"    - Email 7: NO MATCH (not involving jan.novak)")
     print(f"    - Email 8: Řádná dovolená (to jan.novak)")
+    print(f"    - Email 9: Out of office with non-breaking spaces (to jan.novak)")
     print(f"\n[*] Test the parser:")
     print(f"    python mbox_email_parser.py --mbox {filename} --email jan.novak@firma.cz --dry-run")
 
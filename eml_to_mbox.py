@@ -8,27 +8,122 @@ Author: Claude
 Version: 1.0
 """
 
-import mailbox
 import email
 import os
+import re
 import sys
+import time
 import argparse
 import glob
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+# fcntl is POSIX-only; on Windows the output file is written without a lock
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# Lines starting with "From " (optionally already quoted with ">") must be
+# escaped inside message bodies so they are not mistaken for separators (mboxrd)
+FROM_LINE_RE = re.compile(rb'^(>*From )', re.MULTILINE)
+
+# Plain "<dir>/*.eml" or "<dir>/**/*.eml" patterns (no wildcards in <dir>)
+# can be served by a direct directory walk instead of glob
+SIMPLE_EML_PATTERN_RE = re.compile(r'^(?P<root>(?:[^*?\[]*[/\\])?)(?P<recursive>\*\*[/\\])?\*\.eml$')
+
+# Minimum seconds between progress updates (at most 20 per second)
+PROGRESS_INTERVAL = 0.05
+
+
+def iter_eml_files(root, recursive=False):
+    """
+    Yield .eml file paths under root using os.scandir.
+
+    Matches glob semantics for "*.eml" (case-sensitive suffix, hidden
+    entries skipped); symlinked directories are not followed.
+
+    Args:
+        root: Directory to scan ('' for current directory)
+        recursive: Descend into subdirectories
+
+    Yields:
+        File paths
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory or '.') as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        stack.append(os.path.join(directory, entry.name))
+                    elif entry.name.endswith('.eml') and entry.is_file():
+                        yield os.path.join(directory, entry.name)
+        except OSError:
+            continue
+
+
+def find_eml_files(input_pattern):
+    """
+    Expand input pattern to a sorted list of files.
+
+    Args:
+        input_pattern: Glob pattern for input .eml files
+
+    Returns:
+        Sorted list of file paths
+    """
+    match = SIMPLE_EML_PATTERN_RE.match(input_pattern)
+    if match:
+        return sorted(iter_eml_files(match.group('root'),
+                                     recursive=bool(match.group('recursive'))))
+
+    return sorted(glob.glob(input_pattern, recursive=True))
+
+
+def serialize_eml_file(eml_path):
+    """
+    Read, parse and serialize EML file for mbox output.
+
+    Runs in worker processes, so it only returns picklable values.
+
+    Args:
+        eml_path: Path to .eml file
+
+    Returns:
+        Tuple: (message_bytes, error) - message_bytes is None on failure
+    """
+    try:
+        with open(eml_path, 'rb') as f:
+            msg = email.message_from_binary_file(f)
+
+        body = FROM_LINE_RE.sub(rb'>\1', msg.as_bytes())
+        if not body.endswith(b'\n'):
+            body += b'\n'
+        return body, None
+
+    except Exception as e:
+        return None, str(e)
+
 
 class EMLToMboxConverter:
     """Converter for EML files to mbox format."""
 
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, workers=None):
         """
         Initialize converter.
 
         Args:
             verbose: Enable verbose output
+            workers: Number of parser processes (default: CPU count)
         """
         self.verbose = verbose
+        self.workers = workers or os.cpu_count() or 1
         self.processed = 0
         self.failed = 0
         self.skipped = 0
@@ -45,40 +140,34 @@ class EMLToMboxConverter:
             timestamp = datetime.now().strftime("%H:%M:%S")
             print(f"[{timestamp}] [{level}] {message}")
 
-    def read_eml_file(self, eml_path):
+    def write_mbox_entry(self, f, msg_bytes):
         """
-        Read and parse EML file.
+        Write a single message to an open mbox file.
 
         Args:
-            eml_path: Path to .eml file
-
-        Returns:
-            email.message.Message object or None on failure
+            f: Output file opened in binary append mode
+            msg_bytes: Serialized message from serialize_eml_file
         """
-        try:
-            with open(eml_path, 'rb') as f:
-                msg = email.message_from_binary_file(f)
-            return msg
-
-        except Exception as e:
-            self.log(f"Failed to read {eml_path}: {e}", "ERROR")
-            return None
+        f.write(b'From MAILER-DAEMON ' + time.asctime(time.gmtime()).encode() + b'\n')
+        f.write(msg_bytes)
+        f.write(b'\n')
+        f.flush()
 
-    def add_to_mbox(self, mbox, msg, source_file):
+    def add_to_mbox(self, mbox_file, msg_bytes, source_file):
         """
         Add email message to mbox.
 
         Args:
-            mbox: mailbox.mbox object
-            msg: email.message.Message object
+            mbox_file: Output mbox file opened in binary append mode
+            msg_bytes: Serialized message from serialize_eml_file
             source_file: Source file path (for logging)
 
         Returns:
             Success boolean
         """
         try:
-            # Add message to mbox
-            mbox.add(msg)
+            # Append message to mbox
+            self.write_mbox_entry(mbox_file, msg_bytes)
             self.processed += 1
             self.log(f"Added: {os.path.basename(source_file)}")
             return True
@@ -103,7 +192,7 @@ class EMLToMboxConverter:
 
         # Expand glob pattern
         self.log(f"Searching for files matching: {input_pattern}")
-        eml_files = sorted(glob.glob(input_pattern, recursive=True))
+        eml_files = find_eml_files(input_pattern)
 
         if not eml_files:
             self.log(f"No .eml files found matching pattern: {input_pattern}", "WARNING")
@@ -126,41 +215,62 @@ class EMLToMboxConverter:
         self.log(f"Creating mbox: {output_path}")
 
         try:
-            mbox = mailbox.mbox(output_path)
-            mbox.lock()
+            mbox_file = open(output_path, 'ab')
+            if HAS_FCNTL:
+                fcntl.flock(mbox_file.fileno(), fcntl.LOCK_EX)
 
         except Exception as e:
             self.log(f"Failed to create mbox file: {e}", "ERROR")
             return None
 
-        # Process each EML file
-        self.log(f"\nProcessing {len(eml_files)} files...\n")
-
-        for i, eml_file in enumerate(eml_files, 1):
-            if self.verbose:
-                print(f"\r[{i}/{len(eml_files)}] Processing...", end='', flush=True)
-            elif i % 10 == 0:
-                print(f"\rProcessed: {i}/{len(eml_files)}", end='', flush=True)
-
-            # Check file extension
+        # Skip non-EML files up front so workers only get parseable input
+        for eml_file in eml_files:
             if not eml_file.lower().endswith('.eml'):
                 self.log(f"Skipping non-EML file: {eml_file}", "WARNING")
                 self.skipped += 1
-                continue
+        eml_files = [f for f in eml_files if f.lower().endswith('.eml')]
 
-            # Read EML file
-            msg = self.read_eml_file(eml_file)
-            if msg is None:
-                self.failed += 1
-                continue
+        # Process each EML file (parsing fans out to worker processes,
+        # results come back in input order)
+        self.log(f"\nProcessing {len(eml_files)} files with {self.workers} worker(s)...\n")
 
-            # Add to mbox
-            self.add_to_mbox(mbox, msg, eml_file)
+        executor = None
+        if self.workers > 1 and len(eml_files) > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+            results = executor.map(serialize_eml_file, eml_files, chunksize=32)
+        else:
+            results = map(serialize_eml_file, eml_files)
+
+        # Progress is printed at most every `tick` files and PROGRESS_INTERVAL seconds
+        total = len(eml_files)
+        tick = max(1, total // 500)
+        last_progress = 0.0
+
+        try:
+            for i, (eml_file, (msg_bytes, error)) in enumerate(zip(eml_files, results), 1):
+                if (i % tick == 0 and time.monotonic() - last_progress >= PROGRESS_INTERVAL) or i == total:
+                    last_progress = time.monotonic()
+                    if self.verbose:
+                        print(f"\r[{i}/{total}] Processing...", end='', flush=True)
+                    else:
+                        print(f"\rProcessed: {i}/{total}", end='', flush=True)
+
+                if msg_bytes is None:
+                    self.log(f"Failed to read {eml_file}: {error}", "ERROR")
+                    self.failed += 1
+                    continue
+
+                # Add to mbox
+                self.add_to_mbox(mbox_file, msg_bytes, eml_file)
+        finally:
+            if executor:
+                executor.shutdown()
 
         # Finalize
         print()  # New line after progress
-        mbox.unlock()
-        mbox.close()
+        if HAS_FCNTL:
+            fcntl.flock(mbox_file.fileno(), fcntl.LOCK_UN)
+        mbox_file.close()
 
         elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -217,6 +327,13 @@ Examples:
         help='Enable verbose output'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of parallel parser processes (default: CPU count)'
+    )
+
     args = parser.parse_args()
 
     # Validate output file extension
@@ -232,7 +349,7 @@ Examples:
     print("EML TO MBOX CONVERTER v1.0")
     print("="*60 + "\n")
 
-    converter = EMLToMboxConverter(verbose=args.verbose)
+    converter = EMLToMboxConverter(verbose=args.verbose, workers=args.workers)
     stats = converter.convert(args.input, args.output)
 
     if stats is None:
@@ -22,9 +22,17 @@ import email
 from email.header import decode_header
 from email.utils import getaddresses, parsedate_to_datetime
 from pathlib import Path
+from functools import lru_cache, partial
+from itertools import groupby, islice
 from datetime import datetime
+from dataclasses import dataclass
 import shutil
 import re
+import unicodedata
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import sqlite3
 
 # Third-party imports
 try:
@@ -36,33 +44,125 @@ except ImportError:
     sys.exit(1)
 
 try:
-    from openai import AzureOpenAI
+    from openai import AsyncAzureOpenAI, RateLimitError, APIConnectionError, APITimeoutError
     HAS_OPENAI = True
 except ImportError:
     HAS_OPENAI = False
     print("[ERROR] openai package not installed. Install with: pip install openai")
     sys.exit(1)
 
+# Optional: Rust-based EML parser (much faster than stdlib email.parser)
+try:
+    from fast_mail_parser import parse_email, ParseError
+    HAS_FAST_MAIL_PARSER = True
+except ImportError:
+    HAS_FAST_MAIL_PARSER = False
+
+# Optional: C-based HTML parser for html_to_text (falls back to regex tag removal)
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+# Optional: charset detection for parts with a missing or wrong charset
+try:
+    from charset_normalizer import from_bytes as detect_charset
+    HAS_CHARSET_NORMALIZER = True
+except ImportError:
+    HAS_CHARSET_NORMALIZER = False
+
+# Optional: faster JSON parsing/serialization (falls back to stdlib json)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional: local token counting for the prompt prefix report
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+# Optional: tqdm progress bar (falls back to a plain status line)
+try:
+    from tqdm import tqdm
+    HAS_TQDM = True
+except ImportError:
+    HAS_TQDM = False
+
+# Optional: Aho-Corasick automaton for the keyword prefilter (falls back to regex)
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 # =============================================================================
 # GLOBAL CONFIGURATION
 # =============================================================================
 
-# Global counters (for signal handler)
-processed_count = 0
-matched_count = 0
-rejected_count = 0
-failed_count = 0
-total_input_tokens = 0
-total_output_tokens = 0
-total_cost_usd = 0.0
+# Output token caps: a short JSON answer, more headroom for thinking models
+MAX_COMPLETION_TOKENS = 120
+MAX_COMPLETION_TOKENS_REASONING = 500
+
+# Worker threads for blocking file I/O (EML reads, copies to output directories)
+IO_WORKERS = 8
 
-# Azure OpenAI client (initialized in main)
+# Azure OpenAI caches prompt prefixes of at least this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Azure OpenAI async client (initialized in main)
 openai_client = None
+client_pool = None
 deployment_name = None
 price_input = 0.0
 price_output = 0.0
 reasoning_effort = None
 temperature = None
+stream_responses = False
+
+# =============================================================================
+# RUN STATE
+# =============================================================================
+
+@dataclass
+class RunState:
+    """
+    Counters of one processing run.
+
+    A single instance is passed to the analyzers, the progress display and
+    the signal handler. All updates happen on the event loop thread between
+    awaits, so no lock is needed.
+    """
+    processed: int = 0
+    matched: int = 0
+    rejected: int = 0
+    failed: int = 0
+    prefiltered: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self):
+        return self.input_tokens + self.output_tokens
+
+    def record_usage(self, input_tokens, output_tokens, cached_tokens=0, price_factor=1.0):
+        """Add token usage and cost of one call."""
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.cached_tokens += cached_tokens
+
+        cost = (input_tokens / 1_000_000 * price_input) + (output_tokens / 1_000_000 * price_output)
+        self.cost_usd += cost * price_factor
 
 # =============================================================================
 # QUOTE PATTERNS (reused from mbox_email_parser.py)
@@ -91,36 +191,61 @@ QUOTE_PATTERNS = [
     r'^\[\d{4}-\d{2}-\d{2}',
 ]
 
-COMPILED_QUOTE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in QUOTE_PATTERNS]
+# Searched with "\n" prepended to the body: the literal "\n" prefix lets the
+# regex engine jump between line starts instead of trying every position
+COMBINED_QUOTE_PATTERN = re.compile(
+    r'\n(?:' + '|'.join(f'(?:{p.lstrip("^")})' for p in QUOTE_PATTERNS).replace(r'\s', r'[^\S\n]') + r')',
+    re.IGNORECASE | re.MULTILINE
+)
 
 # =============================================================================
 # SIGNAL HANDLER (Ctrl+C)
 # =============================================================================
 
-def signal_handler(sig, frame):
-    """Handle Ctrl+C gracefully."""
+def signal_handler(state, sig, frame):
+    """Handle Ctrl+C gracefully (registered in main with the run's RunState bound)."""
     print("\n\n[!] Ctrl+C detected - graceful shutdown...")
-    print(f"Processed: {processed_count}")
-    print(f"Matched:   {matched_count}")
-    print(f"Rejected:  {rejected_count}")
-    print(f"Failed:    {failed_count}")
-    print(f"Tokens:    {total_input_tokens + total_output_tokens:,}")
-    print(f"Cost:      ${total_cost_usd:.4f} USD")
+    print(f"Processed: {state.processed}")
+    print(f"Matched:   {state.matched}")
+    print(f"Rejected:  {state.rejected}")
+    print(f"Failed:    {state.failed}")
+    print(f"Tokens:    {state.total_tokens:,}")
+    print(f"Cost:      ${state.cost_usd:.4f} USD")
     print("\nPartial results saved.")
     sys.exit(0)
 
-# Register signal handler
-signal.signal(signal.SIGINT, signal_handler)
-
 # =============================================================================
 # HELPER FUNCTIONS (reused from mbox_email_parser.py)
 # =============================================================================
 
+def load_json(data):
+    """Parse JSON text or bytes (orjson when installed)."""
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+def dump_json(obj, indent=False):
+    """Serialize to a JSON string with non-ASCII kept as-is (orjson when installed)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
 def decode_header_value(header_value):
     """Decode email header value (handles encoded words)."""
     if not header_value:
         return ""
 
+    # Header objects (raw non-ASCII headers) are unhashable - skip the cache
+    if not isinstance(header_value, str):
+        return _decode_header_cached.__wrapped__(header_value)
+
+    # No encoded words - decode_header would return the value unchanged
+    if '=?' not in header_value:
+        return header_value
+
+    return _decode_header_cached(header_value)
+
+@lru_cache(maxsize=65536)
+def _decode_header_cached(header_value):
+    """Decode header value; cached since subjects and senders repeat across emails."""
     try:
         decoded_parts = decode_header(header_value)
         result = []
@@ -146,66 +271,119 @@ def decode_with_fallback(payload, charset):
     if not payload:
         return ""
 
-    charsets_to_try = [charset, 'cp1250', 'utf-8', 'latin1']
-
-    for cs in charsets_to_try:
-        if cs is None:
-            continue
+    if charset:
         try:
-            return payload.decode(cs)
-        except:
-            continue
+            return payload.decode(charset)
+        except (UnicodeDecodeError, LookupError):
+            pass
+
+    if payload.isascii():
+        return payload.decode('ascii')
+
+    # Valid non-ASCII UTF-8 is almost never accidental (and much cheaper than detection)
+    try:
+        return payload.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+
+    if HAS_CHARSET_NORMALIZER:
+        best = detect_charset(payload).best()
+        if best is not None:
+            return str(best)
+
+    try:
+        return payload.decode('cp1250')
+    except UnicodeDecodeError:
+        pass
 
     return payload.decode('latin1', errors='ignore')
 
 def html_to_text(html):
-    """Convert HTML to plain text (simple version without BeautifulSoup)."""
+    """Convert HTML to plain text (selectolax if installed, else regex)."""
     if not html:
         return ""
 
+    if HAS_SELECTOLAX:
+        try:
+            tree = HTMLParser(html)
+            tree.strip_tags(['script', 'style'])
+            return ' '.join(tree.text(separator=' ').split())
+        except:
+            pass
+
     # Simple HTML tag removal
     text = re.sub(r'<[^>]+>', ' ', html)
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
+def decode_plain_parts(payloads, charset):
+    """Decode consecutive plain-text payloads sharing a charset (one buffer when safe)."""
+    if len(payloads) > 1 and charset:
+        try:
+            if ' '.encode(charset) == b' ':
+                return [b' '.join(payloads).decode(charset)]
+        except (UnicodeError, LookupError):
+            pass
+
+    return [decode_with_fallback(payload, charset) for payload in payloads]
+
+def iter_body_parts(part):
+    """Yield text/plain and text/html body parts, skipping attachments and redundant HTML alternatives."""
+    if part.is_multipart():
+        children = part.get_payload()
+
+        if part.get_content_subtype() == 'alternative' and any(
+                child.get_content_type() == 'text/plain' and child.get_payload()
+                for child in children):
+            children = [child for child in children if child.get_content_type() != 'text/html']
+
+        for child in children:
+            yield from iter_body_parts(child)
+
+    elif part.get_content_maintype() == 'text':
+        content_type = part.get_content_type()
+        if content_type != 'text/plain' and content_type != 'text/html':
+            return
+        if 'attachment' in (part.get('Content-Disposition') or '').lower():
+            return
+        yield part
+
 def extract_email_body(msg):
     """Extract complete text body from email."""
-    text_parts = []
+    # Body parts of fast_mail_parser results are already decoded (only
+    # single-part text messages are kept as ParsedEmail, see read_eml_file)
+    if isinstance(msg, ParsedEmail):
+        text_parts = list(msg.text_plain)
+        text_parts.extend(html_to_text(html) for html in msg.text_html)
+        return ' '.join(text_parts)
+
+    # (payload, charset, is_html) for every text part, in walk order
+    pieces = []
 
     try:
         if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-
-                if content_type == 'text/plain':
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        text = decode_with_fallback(payload, part.get_content_charset())
-                        text_parts.append(text)
-
-                elif content_type == 'text/html':
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        html = decode_with_fallback(payload, part.get_content_charset())
-                        text = html_to_text(html)
-                        text_parts.append(text)
+            for part in iter_body_parts(msg):
+                payload = part.get_payload(decode=True)
+                if payload:
+                    pieces.append((payload, part.get_content_charset(), part.get_content_type() == 'text/html'))
 
         else:
             payload = msg.get_payload(decode=True)
             if payload:
-                content_type = msg.get_content_type()
-
-                if content_type == 'text/html':
-                    html = decode_with_fallback(payload, msg.get_content_charset())
-                    text = html_to_text(html)
-                    text_parts.append(text)
-                else:
-                    text = decode_with_fallback(payload, msg.get_content_charset())
-                    text_parts.append(text)
+                pieces.append((payload, msg.get_content_charset(), msg.get_content_type() == 'text/html'))
 
     except Exception as e:
         pass
 
+    # Decode consecutive parts of the same kind and charset together
+    text_parts = []
+    for (charset, is_html), group in groupby(pieces, key=lambda piece: piece[1:]):
+        payloads = [piece[0] for piece in group]
+        if is_html:
+            text_parts.extend(html_to_text(decode_with_fallback(payload, charset)) for payload in payloads)
+        else:
+            text_parts.extend(decode_plain_parts(payloads, charset))
+
     return ' '.join(text_parts)
 
 def extract_immediate_reply(body_text):
@@ -213,25 +391,13 @@ def extract_immediate_reply(body_text):
     if not body_text or len(body_text.strip()) < 10:
         return body_text
 
-    lines = body_text.split('\n')
-    immediate_lines = []
-    quote_detected = False
-
-    for line in lines:
-        is_quote_line = False
-
-        for pattern in COMPILED_QUOTE_PATTERNS:
-            if pattern.match(line):
-                is_quote_line = True
-                quote_detected = True
-                break
-
-        if is_quote_line:
-            break
-
-        immediate_lines.append(line)
+    quote_match = COMBINED_QUOTE_PATTERN.search('\n' + body_text)
+    quote_detected = quote_match is not None
 
-    immediate_text = '\n'.join(immediate_lines).strip()
+    if quote_detected:
+        immediate_text = body_text[:quote_match.start()].strip()
+    else:
+        immediate_text = body_text.strip()
 
     MIN_REPLY_LENGTH = 20
 
@@ -242,32 +408,169 @@ def extract_immediate_reply(body_text):
     else:
         return immediate_text
 
+# Standard signature delimiter line ("-- ", RFC 3676)
+SIGNATURE_DELIMITER = re.compile(r'^-- ?\r?$', re.MULTILINE)
+
+def strip_signature(text):
+    """Cut text at the signature delimiter (keeps text without one unchanged)."""
+    match = SIGNATURE_DELIMITER.search(text)
+    if match and match.start() > 0:
+        return text[:match.start()].rstrip()
+    return text
+
 # =============================================================================
 # EML FILE READING
 # =============================================================================
 
+class ParsedEmail:
+    """Lightweight message wrapper around a fast_mail_parser result."""
+
+    def __init__(self, parsed):
+        # fast_mail_parser returns a list of values per header; keep the first
+        self.headers = {k.lower(): v[0] if isinstance(v, list) else v
+                        for k, v in parsed.headers.items() if v}
+        self.text_plain = list(parsed.text_plain)
+        self.text_html = list(parsed.text_html)
+
+    def get(self, name, default=None):
+        """Get header value (case-insensitive), like email.message.Message.get."""
+        return self.headers.get(name.lower(), default)
+
+    def is_single_text_part(self):
+        """True for a non-attachment text/plain or text/html message (no MIME tree)."""
+        content_type = str(self.get('content-type') or 'text/plain').split(';')[0].strip().lower()
+        disposition = str(self.get('content-disposition') or '').lower()
+        return content_type in ('text/plain', 'text/html') and 'attachment' not in disposition
+
 def read_eml_file(filepath):
     """
     Read EML file and return parsed message.
 
+    Uses fast_mail_parser when installed, falling back to the stdlib
+    parser if it is missing or cannot parse the file. fast_mail_parser
+    flattens the MIME tree (HTML alternatives and text attachments end up
+    next to the body), so multipart messages also go through the stdlib
+    parser and iter_body_parts - the LLM input does not depend on which
+    parser is installed.
+
     Args:
         filepath: Path to EML file
 
     Returns:
-        email.message.Message object or None on error
+        ParsedEmail / email.message.Message object or None on error
     """
     try:
         with open(filepath, 'rb') as f:
+            if HAS_FAST_MAIL_PARSER:
+                # fast_mail_parser needs the whole file as bytes
+                data = f.read()
+                try:
+                    parsed = ParsedEmail(parse_email(data))
+                    if parsed.is_single_text_part():
+                        return parsed
+                except ParseError:
+                    pass
+                return email.message_from_bytes(data)
+
+            # Stdlib parser reads the file in chunks (no full-file bytes copy)
             msg = email.message_from_binary_file(f)
         return msg
     except Exception as e:
-        print(f"[ERROR] Failed to read {filepath}: {e}")
+        print(f"[ERROR] Failed to read {os.fspath(filepath)}: {e}")
+        return None
+
+# =============================================================================
+# KEYWORD PREFILTER
+# =============================================================================
+
+def fold_text(text):
+    """Lowercase text and strip diacritics (e.g. 'Dovolená' -> 'dovolena')."""
+    # Pure ASCII needs no decomposition (skips the NFKD pass and two copies)
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+
+def load_prefilter_keywords(filepath):
+    """
+    Load prefilter keywords (one literal keyword per line, # comments).
+
+    Args:
+        filepath: Path to keyword file
+
+    Returns:
+        List of keywords or None on error
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            keywords = []
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    keywords.append(line)
+        return keywords
+    except Exception as e:
+        print(f"[ERROR] Failed to read prefilter keywords: {e}")
         return None
 
+class KeywordPrefilter:
+    """Cheap keyword check that rejects emails before the LLM call."""
+
+    def __init__(self, keywords):
+        # Keywords and text are both folded to lowercase ASCII before matching
+        self.keywords = sorted({fold_text(k) for k in keywords} - {''})
+
+        if HAS_AHOCORASICK:
+            self.automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self.automaton.add_word(keyword, keyword)
+            self.automaton.make_automaton()
+        else:
+            self.automaton = None
+            self.pattern = re.compile('|'.join(re.escape(k) for k in self.keywords))
+
+    def matches(self, text):
+        """Return True if text contains at least one keyword."""
+        text = fold_text(text)
+
+        if self.automaton is not None:
+            for _ in self.automaton.iter(text):
+                return True
+            return False
+
+        return self.pattern.search(text) is not None
+
 # =============================================================================
 # AZURE OPENAI CLIENT
 # =============================================================================
 
+# Errors after which a request is retried right away on the next endpoint
+FAILOVER_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError)
+
+class ClientPool:
+    """Clients for one or more Azure endpoints/deployments (round-robin with failover)."""
+
+    def __init__(self, members):
+        # members: list of (client, deployment, endpoint)
+        self.members = members
+        self.index = 0
+
+    def __len__(self):
+        return len(self.members)
+
+    def next(self):
+        """Next (client, deployment) in round-robin order."""
+        client, deployment, _ = self.members[self.index % len(self.members)]
+        self.index += 1
+        return client, deployment
+
+    async def close(self):
+        for client, _, _ in self.members:
+            await client.close()
+
+def split_env_list(name):
+    """Comma-separated environment variable as a list (empty if unset)."""
+    return [item.strip() for item in os.getenv(name, '').split(',') if item.strip()]
+
 def initialize_azure_openai():
     """
     Initialize Azure OpenAI client from .env configuration.
@@ -275,7 +578,7 @@ def initialize_azure_openai():
     Returns:
         Tuple: (client, deployment_name, price_input, price_output, reasoning_effort, temperature) or (None, None, 0, 0, None, None) on error
     """
-    global openai_client, deployment_name, price_input, price_output
+    global openai_client, deployment_name, price_input, price_output, client_pool
 
     # Load .env file
     if not load_dotenv():
@@ -298,28 +601,49 @@ def initialize_azure_openai():
     temperature_str = os.getenv('AZURE_OPENAI_TEMPERATURE', '')
     temperature = float(temperature_str) if temperature_str else None
 
+    # Optional endpoint pool (comma-separated, overrides AZURE_OPENAI_ENDPOINT);
+    # keys and deployments default to the single-endpoint values
+    endpoints = split_env_list('AZURE_OPENAI_ENDPOINTS') or ([endpoint] if endpoint else [])
+    api_keys = split_env_list('AZURE_OPENAI_API_KEYS') or [api_key] * len(endpoints)
+    deployments = split_env_list('AZURE_OPENAI_DEPLOYMENTS') or [deployment] * len(endpoints)
+
     # Validate required fields
-    if not endpoint:
+    if not endpoints:
         print("[ERROR] AZURE_OPENAI_ENDPOINT not set in .env")
         return None, None, 0, 0, None, None
 
-    if not api_key:
-        print("[ERROR] AZURE_OPENAI_API_KEY not set in .env")
+    if len(api_keys) != len(endpoints) or len(deployments) != len(endpoints):
+        print("[ERROR] AZURE_OPENAI_API_KEYS / AZURE_OPENAI_DEPLOYMENTS must list one value per endpoint in AZURE_OPENAI_ENDPOINTS")
         return None, None, 0, 0, None, None
 
-    if not deployment:
-        print("[ERROR] AZURE_OPENAI_DEPLOYMENT not set in .env")
+    if not all(api_keys):
+        print("[ERROR] AZURE_OPENAI_API_KEY (or AZURE_OPENAI_API_KEYS) not set in .env")
         return None, None, 0, 0, None, None
 
-    # Create client
+    if not all(deployments):
+        print("[ERROR] AZURE_OPENAI_DEPLOYMENT (or AZURE_OPENAI_DEPLOYMENTS) not set in .env")
+        return None, None, 0, 0, None, None
+
+    # Batch API/file calls go through the first endpoint - use its deployment
+    deployment = deployments[0]
+
+    # Create clients (the first one also serves Batch API/file calls)
     try:
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=api_key,
-            api_version=api_version
-        )
+        members = []
+        for pool_endpoint, pool_key, pool_deployment in zip(endpoints, api_keys, deployments):
+            pool_client = AsyncAzureOpenAI(
+                azure_endpoint=pool_endpoint,
+                api_key=pool_key,
+                api_version=api_version
+            )
+            members.append((pool_client, pool_deployment, pool_endpoint))
+
+        client_pool = ClientPool(members)
+        client = members[0][0]
 
         print(f"[✓] Azure OpenAI configured: {deployment}")
+        if len(members) > 1:
+            print(f"[✓] Endpoint pool: {len(members)} endpoints ({', '.join(d for _, d, _ in members)})")
         if reasoning_effort:
             print(f"[✓] Reasoning effort: {reasoning_effort}")
         if temperature is not None:
@@ -332,100 +656,193 @@ def initialize_azure_openai():
         print(f"[ERROR] Failed to initialize Azure OpenAI: {e}")
         return None, None, 0, 0, None, None
 
+def count_prompt_tokens(text, model=None):
+    """Count tokens locally with tiktoken (None if tiktoken is not installed)."""
+    if not HAS_TIKTOKEN:
+        return None
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception:
+        # Azure deployment names are often not model names
+        encoding = tiktoken.get_encoding('o200k_base')
+
+    return len(encoding.encode(text))
+
 # =============================================================================
 # LLM ANALYSIS
 # =============================================================================
 
-def analyze_email_with_llm(system_prompt, user_prompt, email_data, max_retries=1):
+def max_completion_tokens():
+    """Output token cap per email (the JSON answer needs ~60 tokens)."""
+    # Thinking models spend part of the cap on hidden reasoning tokens
+    if reasoning_effort and reasoning_effort != 'minimal':
+        return MAX_COMPLETION_TOKENS_REASONING
+    return MAX_COMPLETION_TOKENS
+
+def build_api_params(system_prompt, user_prompt, email_data):
+    """Build chat completion parameters for one email (shared by live and batch calls)."""
+    # Construct full user message (static prompt first so the prefix stays
+    # byte-identical across calls and hits Azure's prompt cache). A single
+    # f-string builds it in one pass; a precomputed prefix + "".join is slower.
+    user_message = f"""{user_prompt}
+
+EMAIL TO ANALYZE:
+From: {email_data['from']}
+Date: {email_data['date']}
+Subject: {email_data['subject']}
+
+{email_data['body']}
+
+Respond with JSON only:
+{{"is_match": true/false, "confidence": 0.95, "reasoning": "max 20 words"}}"""
+
+    api_params = {
+        "model": deployment_name,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ],
+        "response_format": {"type": "json_object"},
+        "max_completion_tokens": max_completion_tokens()
+    }
+
+    # Add temperature if set (thinking models like gpt-5-nano only support default)
+    if temperature is not None:
+        api_params["temperature"] = temperature
+
+    # Add reasoning_effort if set (for thinking models like gpt-5-nano)
+    if reasoning_effort:
+        api_params["reasoning_effort"] = reasoning_effort
+
+    return api_params
+
+def parse_llm_result(content, input_tokens, output_tokens):
+    """Parse LLM JSON answer into a result dict (raises ValueError on invalid structure)."""
+    result = load_json(content)
+
+    # Validate result structure
+    if 'is_match' not in result or 'confidence' not in result:
+        raise ValueError("Invalid JSON structure from LLM")
+
+    return {
+        'success': True,
+        'decision': result['is_match'],
+        'confidence': result['confidence'],
+        'reasoning': result.get('reasoning', ''),
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'error': None
+    }
+
+async def read_streamed_completion(stream):
+    """
+    Collect a streamed completion, stopping as soon as the JSON answer is complete.
+
+    Args:
+        stream: Async chunk stream from chat.completions.create(stream=True)
+
+    Returns:
+        Tuple: (content, usage) - usage is None if the stream was stopped before
+        the final usage chunk arrived
+    """
+    parts = []
+    usage = None
+
+    try:
+        async for chunk in stream:
+            if getattr(chunk, 'usage', None):
+                usage = chunk.usage
+
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+
+            parts.append(delta)
+
+            # Stop reading once the JSON object closes and parses
+            if delta.rstrip().endswith('}'):
+                try:
+                    load_json(''.join(parts))
+                    break
+                except ValueError:
+                    pass
+    finally:
+        await stream.close()
+
+    return ''.join(parts), usage
+
+def estimate_tokens(text):
+    """Token count for usage that was not reported (tiktoken, else ~4 chars per token)."""
+    tokens = count_prompt_tokens(text, deployment_name)
+    return tokens if tokens is not None else len(text) // 4
+
+async def analyze_email_with_llm(system_prompt, user_prompt, email_data, state, max_retries=1):
     """
-    Send email to LLM for analysis.
+    Send email to LLM for analysis (coroutine - many calls run concurrently).
 
     Args:
         system_prompt: System prompt text
         user_prompt: User prompt text
         email_data: Dict with email metadata
+        state: RunState receiving token usage and cost
         max_retries: Number of retries on failure (default: 1)
 
     Returns:
         Dict with keys: success, decision, confidence, reasoning,
                        input_tokens, output_tokens, error
     """
-    global openai_client, deployment_name, total_input_tokens, total_output_tokens, total_cost_usd, price_input, price_output
+    api_params = build_api_params(system_prompt, user_prompt, email_data)
 
-    # Construct full user message
-    user_message = f"""{user_prompt}
-
-EMAIL TO ANALYZE:
-From: {email_data['from']}
-Date: {email_data['date']}
-Subject: {email_data['subject']}
-
-{email_data['body']}
-
-Respond with JSON only:
-{{"is_match": true/false, "confidence": 0.95, "reasoning": "brief explanation"}}"""
+    # With an endpoint pool every endpoint gets a chance before giving up
+    attempts = max_retries + len(client_pool)
 
     # Try API call with retries
-    for attempt in range(max_retries + 1):
+    for attempt in range(attempts):
         try:
-            # Prepare API call parameters
-            api_params = {
-                "model": deployment_name,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                "response_format": {"type": "json_object"},
-                "max_completion_tokens": 500
-            }
+            client, api_params["model"] = client_pool.next()
 
-            # Add temperature if set (thinking models like gpt-5-nano only support default)
-            if temperature is not None:
-                api_params["temperature"] = temperature
-
-            # Add reasoning_effort if set (for thinking models like gpt-5-nano)
-            if reasoning_effort:
-                api_params["reasoning_effort"] = reasoning_effort
-
-            response = openai_client.chat.completions.create(**api_params)
-
-            # Extract tokens
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
+            if stream_responses:
+                stream = await client.chat.completions.create(
+                    **api_params, stream=True, stream_options={"include_usage": True})
+                content, usage = await read_streamed_completion(stream)
+            else:
+                response = await client.chat.completions.create(**api_params)
+                content = response.choices[0].message.content
+                usage = response.usage
+
+            # Extract tokens (estimated if the stream ended before usage was sent)
+            if usage is not None:
+                input_tokens = usage.prompt_tokens
+                output_tokens = usage.completion_tokens
+            else:
+                input_tokens = estimate_tokens(''.join(m['content'] for m in api_params['messages']))
+                output_tokens = estimate_tokens(content)
 
-            # Update global counters
-            total_input_tokens += input_tokens
-            total_output_tokens += output_tokens
+            # Input tokens served from the prompt cache (not reported by every API version)
+            prompt_details = getattr(usage, 'prompt_tokens_details', None)
+            cached_tokens = getattr(prompt_details, 'cached_tokens', 0) or 0
 
-            # Calculate cost
-            cost = (input_tokens / 1_000_000 * price_input) + (output_tokens / 1_000_000 * price_output)
-            total_cost_usd += cost
+            # Update run counters
+            state.record_usage(input_tokens, output_tokens, cached_tokens)
 
             # Parse response
-            content = response.choices[0].message.content
-            result = json.loads(content)
-
-            # Validate result structure
-            if 'is_match' not in result or 'confidence' not in result:
-                raise ValueError("Invalid JSON structure from LLM")
-
-            return {
-                'success': True,
-                'decision': result['is_match'],
-                'confidence': result['confidence'],
-                'reasoning': result.get('reasoning', ''),
-                'input_tokens': input_tokens,
-                'output_tokens': output_tokens,
-                'error': None
-            }
+            return parse_llm_result(content, input_tokens, output_tokens)
 
         except Exception as e:
             error_msg = str(e)
 
             # If this is not the last attempt, retry
-            if attempt < max_retries:
-                print(f"[WARN] API call failed (attempt {attempt + 1}/{max_retries + 1}): {error_msg}")
-                time.sleep(2)  # Wait before retry
+            if attempt < attempts - 1:
+                print(f"[WARN] API call failed (attempt {attempt + 1}/{attempts}): {error_msg}")
+                # Throttled/unreachable endpoint: move on to a sibling right away
+                if len(client_pool) > 1 and isinstance(e, FAILOVER_ERRORS):
+                    await asyncio.sleep(0.2)
+                else:
+                    await asyncio.sleep(2)  # Wait before retry
                 continue
 
             # Last attempt failed
@@ -450,18 +867,307 @@ Respond with JSON only:
         'error': 'Unknown error'
     }
 
+async def analyze_email_batch_with_llm(system_prompt, user_prompt, email_data_list, state):
+    """
+    Analyze several emails in one LLM call (prompt tokens are sent once).
+
+    Falls back to one call per email if the combined answer is invalid.
+
+    Args:
+        system_prompt: System prompt text
+        user_prompt: User prompt text
+        email_data_list: List of dicts with email metadata
+        state: RunState receiving token usage and cost
+
+    Returns:
+        List of result dicts (same order and keys as analyze_email_with_llm)
+    """
+    emails_text = "\n\n".join(
+        f"""EMAIL {i}:
+From: {email_data['from']}
+Date: {email_data['date']}
+Subject: {email_data['subject']}
+
+{email_data['body']}""" for i, email_data in enumerate(email_data_list, 1)
+    )
+
+    user_message = f"""{user_prompt}
+
+Analyze each of the following {len(email_data_list)} emails independently.
+
+{emails_text}
+
+Respond with JSON only, one entry per email:
+{{"results": [{{"id": 1, "is_match": true/false, "confidence": 0.95, "reasoning": "max 20 words"}}, ...]}}"""
+
+    api_params = build_api_params(system_prompt, user_prompt, email_data_list[0])
+    api_params["messages"][1]["content"] = user_message
+    api_params["max_completion_tokens"] = max_completion_tokens() * len(email_data_list)
+
+    try:
+        client, api_params["model"] = client_pool.next()
+        response = await client.chat.completions.create(**api_params)
+
+        input_tokens = response.usage.prompt_tokens
+        output_tokens = response.usage.completion_tokens
+        prompt_details = getattr(response.usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(prompt_details, 'cached_tokens', 0) or 0
+        state.record_usage(input_tokens, output_tokens, cached_tokens)
+
+        content = response.choices[0].message.content
+        answers = load_json(content)['results']
+        answers_by_id = {int(answer['id']): answer for answer in answers}
+
+        # Validate: one well-formed answer per email
+        if sorted(answers_by_id) != list(range(1, len(email_data_list) + 1)):
+            raise ValueError("Batched answer does not cover every email")
+
+        # Token usage is split evenly across the emails for per-email logging
+        share_in = input_tokens // len(email_data_list)
+        share_out = output_tokens // len(email_data_list)
+
+        results = []
+        for i in range(1, len(email_data_list) + 1):
+            answer = answers_by_id[i]
+            if 'is_match' not in answer or 'confidence' not in answer:
+                raise ValueError("Invalid JSON structure from LLM")
+
+            results.append({
+                'success': True,
+                'decision': answer['is_match'],
+                'confidence': answer['confidence'],
+                'reasoning': answer.get('reasoning', ''),
+                'input_tokens': share_in,
+                'output_tokens': share_out,
+                'error': None
+            })
+
+        return results
+
+    except Exception as e:
+        print(f"[WARN] Batched LLM call failed ({e}) - analyzing {len(email_data_list)} emails one by one")
+
+    return [await analyze_email_with_llm(system_prompt, user_prompt, email_data, state)
+            for email_data in email_data_list]
+
+# =============================================================================
+# BATCH API (--batch)
+# =============================================================================
+
+# Batch API jobs are billed at half the interactive price
+BATCH_PRICE_FACTOR = 0.5
+BATCH_POLL_INTERVAL = 30
+BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+def batch_error_result(error_msg):
+    """Result dict for an email without a usable batch response."""
+    return {
+        'success': False,
+        'decision': False,
+        'confidence': 0.0,
+        'reasoning': '',
+        'input_tokens': 0,
+        'output_tokens': 0,
+        'error': error_msg
+    }
+
+def parse_batch_output_line(line, state):
+    """Parse one line of a batch output/error file into (custom_id, result dict)."""
+    record = load_json(line)
+    custom_id = record.get('custom_id')
+
+    if record.get('error'):
+        error = record['error']
+        return custom_id, batch_error_result(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+
+    response = record.get('response') or {}
+    if response.get('status_code') != 200:
+        return custom_id, batch_error_result(f"Batch request failed with HTTP {response.get('status_code')}")
+
+    try:
+        body = response['body']
+        usage = body.get('usage') or {}
+        input_tokens = usage.get('prompt_tokens', 0)
+        output_tokens = usage.get('completion_tokens', 0)
+        cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0) or 0
+
+        state.record_usage(input_tokens, output_tokens, cached_tokens, price_factor=BATCH_PRICE_FACTOR)
+
+        content = body['choices'][0]['message']['content']
+        return custom_id, parse_llm_result(content, input_tokens, output_tokens)
+
+    except Exception as e:
+        return custom_id, batch_error_result(str(e))
+
+async def run_llm_batch(system_prompt, user_prompt, batch_items, requests_path, state):
+    """
+    Analyze emails with one Batch API job (results within 24h at half price).
+
+    Args:
+        system_prompt: System prompt text
+        user_prompt: User prompt text
+        batch_items: List of (custom_id, email_data) tuples
+        requests_path: Where to write the batch request JSONL file
+        state: RunState receiving token usage and cost
+
+    Returns:
+        Dict mapping custom_id to result dict (same keys as analyze_email_with_llm)
+    """
+    # Write one request per email
+    with open(requests_path, 'w', encoding='utf-8') as f:
+        for custom_id, email_data in batch_items:
+            request = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": build_api_params(system_prompt, user_prompt, email_data)
+            }
+            f.write(dump_json(request) + '\n')
+
+    print(f"[*] Uploading {len(batch_items)} requests: {requests_path}")
+    with open(requests_path, 'rb') as f:
+        batch_file = await openai_client.files.create(file=f, purpose="batch")
+
+    batch = await openai_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/chat/completions",
+        completion_window="24h"
+    )
+    print(f"[✓] Batch submitted: {batch.id}")
+
+    # Poll until the job reaches a final state
+    while batch.status not in BATCH_FINAL_STATUSES:
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+        batch = await openai_client.batches.retrieve(batch.id)
+
+        counts = batch.request_counts
+        done = f"{counts.completed + counts.failed}/{counts.total}" if counts else "?"
+        print(f"\r[*] Batch {batch.status}: {done} requests done" + " " * 10, end='', flush=True)
+
+    print(f"\n[✓] Batch {batch.status}: {batch.id}")
+
+    # Collect results (successful responses and per-request errors)
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        content = await openai_client.files.content(file_id)
+        for line in content.text.splitlines():
+            if line.strip():
+                custom_id, result = parse_batch_output_line(line, state)
+                results[custom_id] = result
+
+    # Requests without any output (failed/expired/cancelled job)
+    for custom_id, _ in batch_items:
+        if custom_id not in results:
+            results[custom_id] = batch_error_result(f"No batch result (batch {batch.status})")
+
+    return results
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'llm_email_filter.db')
+
+class ResponseCache:
+    """On-disk cache of LLM answers keyed by model settings, prompts and email content."""
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, result TEXT)')
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(system_prompt, user_prompt, email_data):
+        """SHA256 over everything that is sent to the LLM."""
+        # Always stdlib json: keys must not change with the installed packages
+        payload = json.dumps([
+            deployment_name, temperature, reasoning_effort, system_prompt, user_prompt,
+            email_data['from'], email_data['date'], email_data['subject'], email_data['body']
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached result dict (no token usage) or None."""
+        row = self.conn.execute('SELECT result FROM cache WHERE key = ?', (key,)).fetchone()
+        if not row:
+            return None
+
+        self.hits += 1
+        answer = load_json(row[0])
+        return {
+            'success': True,
+            'decision': answer['decision'],
+            'confidence': answer['confidence'],
+            'reasoning': answer['reasoning'],
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'error': None
+        }
+
+    def put(self, key, result):
+        """Store a successful LLM result."""
+        if not result['success']:
+            return
+
+        answer = {
+            'decision': result['decision'],
+            'confidence': result['confidence'],
+            'reasoning': result['reasoning']
+        }
+        self.conn.execute('INSERT OR REPLACE INTO cache (key, result) VALUES (?, ?)',
+                          (key, dump_json(answer)))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
 # =============================================================================
 # FILE OPERATIONS
 # =============================================================================
 
-def copy_with_confidence_prefix(src_path, dest_dir, confidence):
+def place_file(src_path, dest_path, hardlink=False):
+    """
+    Put a copy of src_path at dest_path.
+
+    With hardlink=True the file is linked (one inode operation, no extra
+    disk space); if linking fails (different filesystem, unsupported) it
+    falls back to a regular copy.
+
+    Args:
+        src_path: Source file path
+        dest_path: Destination file path (replaced if it exists)
+        hardlink: Try a hardlink before copying
+    """
+    if hardlink:
+        try:
+            if os.path.lexists(dest_path):
+                os.remove(dest_path)
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(src_path, dest_path)
+
+def copy_with_confidence_prefix(src_path, dest_dir, confidence, overwrite=True, hardlink=False):
     """
     Copy EML file to destination with confidence score prefix.
 
+    The caller must ensure dest_dir exists (process_emails creates the
+    output directories up front).
+
     Args:
         src_path: Source file path
         dest_dir: Destination directory
         confidence: Confidence score (0.0-1.0)
+        overwrite: Replace an existing copy (False keeps it, used by --resume)
+        hardlink: Hardlink instead of copying when possible (--copy-mode hardlink)
 
     Returns:
         New filename or None on error
@@ -476,12 +1182,10 @@ def copy_with_confidence_prefix(src_path, dest_dir, confidence):
         # Create new filename with confidence prefix
         new_name = f"{confidence_int:02d}_{original_name}"
 
-        # Ensure destination directory exists
-        Path(dest_dir).mkdir(parents=True, exist_ok=True)
-
         # Copy file
         dest_path = os.path.join(dest_dir, new_name)
-        shutil.copy2(src_path, dest_path)
+        if overwrite or not os.path.exists(dest_path):
+            place_file(src_path, dest_path, hardlink)
 
         return new_name
 
@@ -496,7 +1200,9 @@ def copy_with_confidence_prefix(src_path, dest_dir, confidence):
 class CSVLogger:
     """CSV logger for filtering results."""
 
-    def __init__(self, filepath):
+    FLUSH_EVERY = 50
+
+    def __init__(self, filepath, resume=False):
         self.filepath = filepath
         self.fieldnames = [
             'filename',
@@ -515,20 +1221,48 @@ class CSVLogger:
             'output_filename'
         ]
 
+        # Resume: keep existing rows and append to them
+        append = resume and os.path.isfile(filepath) and os.path.getsize(filepath) > 0
+
+        # One buffered handle for the whole run (flushed every FLUSH_EVERY rows)
+        self.rows_since_flush = 0
+        self.rows_written = 0
+        self.file = open(filepath, 'a' if append else 'w', newline='', encoding='utf-8', buffering=1 << 16)
+        # Rows are written as plain sequences in fieldnames order (same output
+        # as csv.DictWriter, without its per-row dict checks)
+        self.writer = csv.writer(self.file)
+
         # Create with headers
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-            writer.writeheader()
+        if not append:
+            self.writer.writerow(self.fieldnames)
+            self.file.flush()
+
+    def load_done(self):
+        """Filenames already logged without an error (used by --resume)."""
+        try:
+            with open(self.filepath, 'r', newline='', encoding='utf-8') as f:
+                return {row['filename'] for row in csv.DictReader(f) if row.get('llm_decision') != 'error'}
+        except FileNotFoundError:
+            return set()
 
     def log(self, **kwargs):
         """Log a result to CSV."""
         try:
-            with open(self.filepath, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-                writer.writerow(kwargs)
+            self.writer.writerow([kwargs.get(name, '') for name in self.fieldnames])
+            self.rows_written += 1
+
+            self.rows_since_flush += 1
+            if self.rows_since_flush >= self.FLUSH_EVERY:
+                self.file.flush()
+                self.rows_since_flush = 0
         except Exception as e:
             print(f"[ERROR] Failed to write to log: {e}")
 
+    def close(self):
+        """Flush and close the log file."""
+        if not self.file.closed:
+            self.file.close()
+
 # =============================================================================
 # PROGRESS TRACKING
 # =============================================================================
@@ -536,13 +1270,29 @@ class CSVLogger:
 class ProgressTracker:
     """Track and display progress."""
 
-    def __init__(self, total):
+    def __init__(self, total, state):
         self.total = total
+        self.state = state
         self.start_time = time.time()
         self.last_update = 0
 
-    def update(self, processed, matched, rejected, failed):
-        """Update progress display."""
+        # tqdm rate-limits its own redraws
+        self.pbar = tqdm(total=total, smoothing=0.1, unit='email') if HAS_TQDM else None
+
+    def update(self):
+        """Update progress display (called once per finished email)."""
+        state = self.state
+        processed = state.processed
+
+        if self.pbar is not None:
+            self.pbar.set_postfix_str(
+                f"✓ {state.matched} ✗ {state.rejected} ⚠ {state.failed} | "
+                f"tokens {state.total_tokens:,} | ${state.cost_usd:.4f}",
+                refresh=False
+            )
+            self.pbar.update(1)
+            return
+
         current_time = time.time()
 
         # Update every 0.5 seconds
@@ -566,10 +1316,10 @@ class ProgressTracker:
         # Build status line
         status = (
             f"\rProcessing: {processed}/{self.total} ({percentage:.1f}%) | "
-            f"✓ Matched: {matched} | ✗ Rejected: {rejected} | ⚠ Failed: {failed}\n"
-            f"Tokens: {total_input_tokens + total_output_tokens:,} "
-            f"(in: {total_input_tokens:,}, out: {total_output_tokens:,}) | "
-            f"Cost: ${total_cost_usd:.4f} | "
+            f"✓ Matched: {state.matched} | ✗ Rejected: {state.rejected} | ⚠ Failed: {state.failed}\n"
+            f"Tokens: {state.total_tokens:,} "
+            f"(in: {state.input_tokens:,}, out: {state.output_tokens:,}) | "
+            f"Cost: ${state.cost_usd:.4f} | "
             f"Speed: {speed:.1f}/s {eta_str}"
         )
 
@@ -577,6 +1327,11 @@ class ProgressTracker:
 
     def finish(self):
         """Finish progress tracking."""
+        if self.pbar is not None:
+            self.pbar.close()
+            print()
+            return
+
         print("\n")
 
     def _format_time(self, seconds):
@@ -592,8 +1347,28 @@ class ProgressTracker:
 # MAIN PROCESSING
 # =============================================================================
 
+def iter_eml_files(input_dir):
+    """
+    Yield .eml files in input_dir lazily using os.scandir.
+
+    DirEntry objects are path-like and expose .name, so they can be used
+    wherever a Path was used before without building one per file.
+
+    Args:
+        input_dir: Input directory with EML files
+
+    Yields:
+        os.DirEntry objects
+    """
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.eml') and entry.is_file():
+                yield entry
+
 def process_emails(input_dir, system_prompt_path, user_prompt_path,
-                   output_dir, log_file, email_limit=None, debug=False):
+                   output_dir, log_file, email_limit=None, debug=False,
+                   prefilter=None, prefilter_max_chars=0, concurrency=16, batch=False, emails_per_call=1,
+                   cache_path=None, resume=False, body_chars=1500, hardlink=False, state=None):
     """
     Main processing function.
 
@@ -605,21 +1380,22 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
         log_file: CSV log file path
         email_limit: Maximum emails to process (None = unlimited)
         debug: Show debug output (default: False)
+        prefilter: KeywordPrefilter to reject emails without an LLM call (optional)
+        prefilter_max_chars: Only prefilter replies shorter than this (0 = any length)
+        concurrency: Maximum number of LLM requests in flight (default: 16)
+        batch: Submit all LLM requests as one Batch API job (default: False)
+        emails_per_call: Emails analyzed together in one LLM call (default: 1)
+        cache_path: SQLite response cache file (None disables the cache)
+        resume: Skip emails already logged in log_file and append to it
+        body_chars: Characters of the immediate reply sent to the LLM (default: 1500)
+        hardlink: Hardlink EML files into the output directories instead of copying
+        state: RunState for the run's counters (default: a fresh one)
 
     Returns:
         Statistics dict
     """
-    global processed_count, matched_count, rejected_count, failed_count
-    global total_input_tokens, total_output_tokens, total_cost_usd
-
-    # Reset counters
-    processed_count = 0
-    matched_count = 0
-    rejected_count = 0
-    failed_count = 0
-    total_input_tokens = 0
-    total_output_tokens = 0
-    total_cost_usd = 0.0
+    if state is None:
+        state = RunState()
 
     # Load prompt files
     print(f"\n[*] Loading prompts...")
@@ -640,18 +1416,51 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
         print(f"[ERROR] Failed to read user prompt: {e}")
         return None
 
-    # Get list of EML files
-    eml_files = list(Path(input_dir).glob('*.eml'))
+    # Static prompt prefix shared by every call (eligible for Azure prompt caching)
+    prefix_tokens = count_prompt_tokens(system_prompt + user_prompt, deployment_name)
+    if prefix_tokens is not None:
+        print(f"[✓] Prompt prefix: {prefix_tokens:,} tokens")
+        if prefix_tokens < PROMPT_CACHE_MIN_TOKENS:
+            print(f"[INFO] Prompt prefix is below {PROMPT_CACHE_MIN_TOKENS} tokens - Azure prompt caching will not apply")
+
+    # List EML files lazily; resume filter and limit are applied before
+    # anything is materialized
+    eml_files = iter_eml_files(input_dir)
+
+    # Initialize CSV logger (appends when resuming)
+    csv_logger = CSVLogger(log_file, resume=resume)
+
+    # Resume: skip emails that an earlier run already processed successfully
+    done = set()
+    if resume:
+        done = csv_logger.load_done()
+        eml_files = (entry for entry in eml_files if entry.name not in done)
+        print(f"[✓] Resume: {len(done)} emails already processed ({log_file})")
 
     if email_limit:
-        eml_files = eml_files[:email_limit]
+        eml_files = islice(eml_files, email_limit)
 
-    total_files = len(eml_files)
+    eml_files = list(eml_files)
 
-    if total_files == 0:
+    if not eml_files:
+        if done:
+            print(f"[✓] Nothing left to process")
+            csv_logger.close()
+            return {
+                'processed': 0,
+                'matched': 0,
+                'rejected': 0,
+                'failed': 0,
+                'tokens': 0,
+                'cost': 0.0,
+                'elapsed': 0.0
+            }
         print(f"[ERROR] No EML files found in {input_dir}")
+        csv_logger.close()
         return None
 
+    total_files = len(eml_files)
+
     print(f"[✓] Input directory: {total_files} EML files found")
 
     # Create output directories
@@ -663,31 +1472,47 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
     Path(rejected_dir).mkdir(parents=True, exist_ok=True)
     Path(failed_dir).mkdir(parents=True, exist_ok=True)
 
-    # Initialize CSV logger
-    csv_logger = CSVLogger(log_file)
+    # Open response cache (reruns reuse answers for unchanged prompts and emails)
+    cache = None
+    if cache_path:
+        try:
+            cache = ResponseCache(cache_path)
+            print(f"[✓] Response cache: {cache_path}")
+        except Exception as e:
+            print(f"[WARN] Response cache disabled ({cache_path}): {e}")
 
     # Initialize progress tracker
-    progress = ProgressTracker(total_files)
+    progress = ProgressTracker(total_files, state)
 
-    print(f"\n[*] Processing emails...\n")
+    if batch:
+        print(f"\n[*] Processing emails (Batch API, polling every {BATCH_POLL_INTERVAL}s)...\n")
+    else:
+        print(f"\n[*] Processing emails ({concurrency} concurrent LLM requests, {emails_per_call} email(s) per request)...\n")
 
     start_time = time.time()
 
-    # Process each EML file
-    for eml_path in eml_files:
+    async def run_io(func, *args):
+        """Run blocking file I/O in the I/O thread pool (keeps the event loop free)."""
+        return await asyncio.get_running_loop().run_in_executor(io_executor, func, *args)
+
+    async def prepare_one(eml_path):
+        """Read EML file and extract email data (failures are copied and logged here).
+
+        Returns (email_data, processing_start) or None on failure.
+        """
         processing_start = time.time()
-        processed_count += 1
+        state.processed += 1
 
         filename = eml_path.name
 
         # Read EML file
-        msg = read_eml_file(eml_path)
+        msg = await run_io(read_eml_file, eml_path)
         if not msg:
-            failed_count += 1
+            state.failed += 1
 
             # Copy to failed directory
             try:
-                shutil.copy2(eml_path, os.path.join(failed_dir, f"failed_{filename}"))
+                await run_io(place_file, eml_path, os.path.join(failed_dir, f"failed_{filename}"), hardlink)
             except:
                 pass
 
@@ -709,8 +1534,8 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
                 output_filename=f"failed_{filename}"
             )
 
-            progress.update(processed_count, matched_count, rejected_count, failed_count)
-            continue
+            progress.update()
+            return None
 
         # Extract email data
         try:
@@ -718,7 +1543,7 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
             subject = decode_header_value(msg.get('Subject', ''))
             date_str = msg.get('Date', '')
             body = extract_email_body(msg)
-            immediate_reply = extract_immediate_reply(body)
+            immediate_reply = strip_signature(extract_immediate_reply(body))
 
             # Debug output
             if debug:
@@ -732,11 +1557,11 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
                 print(f"Immediate reply length: {len(immediate_reply):,} chars")
 
                 # Show truncation info if applicable
-                if len(immediate_reply) > 4000:
-                    print(f"(Will be truncated to 4000 chars for LLM)")
+                if len(immediate_reply) > body_chars:
+                    print(f"(Will be truncated to {body_chars} chars for LLM)")
 
                 print("\n--- Immediate Reply Text (sent to LLM) ---")
-                display_text = immediate_reply[:4000] if len(immediate_reply) > 4000 else immediate_reply
+                display_text = immediate_reply[:body_chars]
                 # Limit display to 500 chars for readability
                 if len(display_text) > 500:
                     print(display_text[:500])
@@ -749,15 +1574,15 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
                 'from': from_addr,
                 'date': date_str,
                 'subject': subject,
-                'body': immediate_reply[:4000]  # Limit to 4000 chars to avoid token limits
+                'body': immediate_reply[:body_chars]  # The signal is near the top; fewer input tokens
             }
 
         except Exception as e:
-            failed_count += 1
+            state.failed += 1
 
             # Copy to failed directory
             try:
-                shutil.copy2(eml_path, os.path.join(failed_dir, f"failed_{filename}"))
+                await run_io(place_file, eml_path, os.path.join(failed_dir, f"failed_{filename}"), hardlink)
             except:
                 pass
 
@@ -779,21 +1604,52 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
                 output_filename=f"failed_{filename}"
             )
 
-            progress.update(processed_count, matched_count, rejected_count, failed_count)
-            continue
+            progress.update()
+            return None
 
-        # Analyze with LLM
-        result = analyze_email_with_llm(system_prompt, user_prompt, email_data)
+        return email_data, processing_start
+
+    def prefilter_result(email_data):
+        """Result dict if the keyword prefilter rejects the email or the answer is cached, else None."""
+        # Keyword prefilter: no keyword in subject/reply -> reject without LLM call
+        # (optionally only for short replies; longer ones still go to the LLM)
+        if (prefilter
+                and (not prefilter_max_chars or len(email_data['body']) < prefilter_max_chars)
+                and not prefilter.matches(email_data['subject'] + ' ' + email_data['body'])):
+            state.prefiltered += 1
+            return {
+                'success': True,
+                'decision': False,
+                'confidence': 0.0,
+                'reasoning': 'Rejected by keyword prefilter (no keyword found)',
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'error': None
+            }
+
+        # Answer from a previous run with the same prompts and email
+        if cache:
+            return cache.get(ResponseCache.make_key(system_prompt, user_prompt, email_data))
+
+        return None
 
+    def store_result(email_data, result):
+        """Save a fresh LLM result in the response cache."""
+        if cache:
+            cache.put(ResponseCache.make_key(system_prompt, user_prompt, email_data), result)
+
+    async def finish_one(eml_path, email_data, result, processing_start):
+        """Copy EML file to the output directory for its result and log it."""
+        filename = eml_path.name
         processing_time_ms = int((time.time() - processing_start) * 1000)
 
         # Handle result
         if not result['success']:
-            failed_count += 1
+            state.failed += 1
 
             # Copy to failed directory
             try:
-                shutil.copy2(eml_path, os.path.join(failed_dir, f"failed_{filename}"))
+                await run_io(place_file, eml_path, os.path.join(failed_dir, f"failed_{filename}"), hardlink)
             except:
                 pass
 
@@ -805,17 +1661,17 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
             confidence = result['confidence']
 
             if decision:
-                matched_count += 1
+                state.matched += 1
                 dest_dir = matched_dir
             else:
-                rejected_count += 1
+                state.rejected += 1
                 dest_dir = rejected_dir
 
             # Copy with confidence prefix
-            output_filename = copy_with_confidence_prefix(eml_path, dest_dir, confidence)
+            output_filename = await run_io(copy_with_confidence_prefix, eml_path, dest_dir, confidence, not resume, hardlink)
 
             if not output_filename:
-                failed_count += 1
+                state.failed += 1
                 output_filename = f"failed_{filename}"
 
         # Log result
@@ -837,7 +1693,145 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
         )
 
         # Update progress
-        progress.update(processed_count, matched_count, rejected_count, failed_count)
+        progress.update()
+
+    async def process_group(eml_paths):
+        """Process a group of EML files (read, extract, analyze in one call, copy, log)."""
+        pending = []
+
+        for eml_path in eml_paths:
+            prepared = await prepare_one(eml_path)
+            if not prepared:
+                continue
+
+            email_data, processing_start = prepared
+
+            result = prefilter_result(email_data)
+            if result is not None:
+                await finish_one(eml_path, email_data, result, processing_start)
+                continue
+
+            pending.append((eml_path, email_data, processing_start))
+
+        if not pending:
+            return
+
+        # Analyze with LLM
+        if len(pending) == 1:
+            results = [await analyze_email_with_llm(system_prompt, user_prompt, pending[0][1], state)]
+        else:
+            results = await analyze_email_batch_with_llm(
+                system_prompt, user_prompt, [email_data for _, email_data, _ in pending], state)
+
+        for (eml_path, email_data, processing_start), result in zip(pending, results):
+            store_result(email_data, result)
+            await finish_one(eml_path, email_data, result, processing_start)
+
+    async def process_bounded(eml_paths, semaphore):
+        """Process group once a concurrency slot is free (bounds memory and API load)."""
+        async with semaphore:
+            # Ctrl+C: emails not started yet are left for --resume
+            if stop_event.is_set():
+                return
+            await process_group(eml_paths)
+
+    async def process_batch():
+        """Prepare all emails, analyze them in one Batch API job, then copy and log."""
+        batch_items = []
+        pending = {}
+
+        for eml_path in eml_files:
+            # Ctrl+C before submitting: nothing is sent, unlogged emails are left for --resume
+            if stop_event.is_set():
+                return
+
+            prepared = await prepare_one(eml_path)
+            if not prepared:
+                continue
+
+            email_data, processing_start = prepared
+
+            result = prefilter_result(email_data)
+            if result is not None:
+                await finish_one(eml_path, email_data, result, processing_start)
+                continue
+
+            batch_items.append((eml_path.name, email_data))
+            pending[eml_path.name] = (eml_path, email_data, processing_start)
+
+        if not batch_items:
+            return
+
+        requests_path = os.path.join(output_dir, 'batch_requests.jsonl')
+        results = await run_llm_batch(system_prompt, user_prompt, batch_items, requests_path, state)
+
+        for custom_id, (eml_path, email_data, processing_start) in pending.items():
+            store_result(email_data, results[custom_id])
+            await finish_one(eml_path, email_data, results[custom_id], processing_start)
+
+    async def process_all():
+        """Run all emails concurrently, at most `concurrency` at a time."""
+        nonlocal stop_event
+
+        # First Ctrl+C stops starting new emails and lets in-flight ones finish
+        # (so their results are copied and logged), the second cancels them
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        tasks = []
+
+        def request_stop():
+            if not stop_event.is_set():
+                print("\n\n[!] Ctrl+C detected - finishing in-flight emails (Ctrl+C again to cancel them)...")
+                stop_event.set()
+                return
+
+            print("\n[!] Ctrl+C again - cancelling in-flight emails...")
+            for task in tasks:
+                task.cancel()
+
+        previous_handler = signal.signal(
+            signal.SIGINT, lambda sig, frame: loop.call_soon_threadsafe(request_stop))
+
+        try:
+            if batch:
+                tasks.append(asyncio.ensure_future(process_batch()))
+                try:
+                    await tasks[0]
+                except asyncio.CancelledError:
+                    pass
+                return
+
+            # Emails sent together in one LLM call
+            groups = [eml_files[i:i + emails_per_call] for i in range(0, len(eml_files), emails_per_call)]
+
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks.extend(asyncio.ensure_future(process_bounded(group, semaphore)) for group in groups)
+
+            # One unexpected error must not cancel the other in-flight emails
+            # (cancelled tasks show up as CancelledError results)
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+            await client_pool.close()
+
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                names = ', '.join(eml_path.name for eml_path in group)
+                print(f"\n[ERROR] Unexpected error processing {names}: {result}")
+                state.failed += 1
+
+    # Process EML files
+    # Threads for EML reads and file copies (overlap with in-flight LLM requests)
+    io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS)
+    stop_event = None
+
+    try:
+        asyncio.run(process_all())
+    finally:
+        io_executor.shutdown()
+        csv_logger.close()
+        if cache:
+            cache.close()
 
     # Finish progress
     progress.finish()
@@ -845,41 +1839,73 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
     # Calculate elapsed time
     elapsed = time.time() - start_time
 
+    # Resume marker: written on Ctrl+C, removed after a complete run
+    interrupted = stop_event is not None and stop_event.is_set()
+    marker_path = os.path.join(output_dir, 'progress.json')
+    try:
+        if interrupted:
+            with open(marker_path, 'w', encoding='utf-8') as f:
+                f.write(dump_json({
+                    'interrupted_at': datetime.now().isoformat(),
+                    'logged': csv_logger.rows_written,
+                    'remaining': total_files - csv_logger.rows_written,
+                    'log_file': log_file,
+                    'resume': 'rerun the same command with --resume'
+                }, indent=True))
+        elif os.path.exists(marker_path):
+            os.remove(marker_path)
+    except OSError as e:
+        print(f"[WARN] Failed to update {marker_path}: {e}")
+
+    # Percentages of processed emails (an early Ctrl+C can leave none)
+    pct_base = state.processed or 1
+
     # Print summary
     print("=" * 80)
-    print("FILTERING COMPLETE")
+    print("FILTERING INTERRUPTED" if interrupted else "FILTERING COMPLETE")
     print("=" * 80)
-    print(f"Total processed:   {processed_count}")
-    print(f"✓ Matched:         {matched_count} ({matched_count/processed_count*100:.1f}%) → {matched_dir}")
-    print(f"✗ Rejected:        {rejected_count} ({rejected_count/processed_count*100:.1f}%) → {rejected_dir}")
-    print(f"⚠ Failed:          {failed_count} ({failed_count/processed_count*100:.1f}%) → {failed_dir}")
+    print(f"Total processed:   {state.processed}")
+    print(f"✓ Matched:         {state.matched} ({state.matched/pct_base*100:.1f}%) → {matched_dir}")
+    print(f"✗ Rejected:        {state.rejected} ({state.rejected/pct_base*100:.1f}%) → {rejected_dir}")
+    print(f"⚠ Failed:          {state.failed} ({state.failed/pct_base*100:.1f}%) → {failed_dir}")
+    if prefilter:
+        print(f"Prefiltered:       {state.prefiltered} (rejected without LLM call)")
+    if cache:
+        print(f"Cache hits:        {cache.hits} (answered from {cache.path})")
     print()
     print("Token usage:")
-    print(f"  Input tokens:    {total_input_tokens:,}")
-    print(f"  Output tokens:   {total_output_tokens:,}")
-    print(f"  Total tokens:    {total_input_tokens + total_output_tokens:,}")
+    print(f"  Input tokens:    {state.input_tokens:,}")
+    print(f"  Output tokens:   {state.output_tokens:,}")
+    print(f"  Cached input:    {state.cached_tokens:,}")
+    print(f"  Total tokens:    {state.total_tokens:,}")
     print()
-    print(f"Cost:              ${total_cost_usd:.4f} USD")
+    print(f"Cost:              ${state.cost_usd:.4f} USD")
     print(f"Time elapsed:      {elapsed:.1f} seconds")
-    print(f"Average speed:     {processed_count/elapsed:.1f} emails/s")
+    print(f"Average speed:     {state.processed/elapsed:.1f} emails/s")
     print()
     print(f"Log file:          {log_file}")
+    if interrupted:
+        print(f"Resume marker:     {marker_path} ({total_files - csv_logger.rows_written} emails left, rerun with --resume)")
 
     # Generate JSON report
     report_path = os.path.join(output_dir, 'filter_report.json')
     try:
         report = {
             'summary': {
-                'total_processed': processed_count,
-                'matched': matched_count,
-                'rejected': rejected_count,
-                'failed': failed_count,
-                'total_tokens': total_input_tokens + total_output_tokens,
-                'input_tokens': total_input_tokens,
-                'output_tokens': total_output_tokens,
-                'total_cost_usd': round(total_cost_usd, 4),
+                'total_processed': state.processed,
+                'interrupted': interrupted,
+                'matched': state.matched,
+                'rejected': state.rejected,
+                'failed': state.failed,
+                'prefiltered': state.prefiltered,
+                'cache_hits': cache.hits if cache else 0,
+                'total_tokens': state.total_tokens,
+                'input_tokens': state.input_tokens,
+                'output_tokens': state.output_tokens,
+                'cached_input_tokens': state.cached_tokens,
+                'total_cost_usd': round(state.cost_usd, 4),
                 'processing_time_seconds': round(elapsed, 2),
-                'average_speed_emails_per_sec': round(processed_count / elapsed, 2)
+                'average_speed_emails_per_sec': round(state.processed / elapsed, 2)
             },
             'configuration': {
                 'input_dir': input_dir,
@@ -887,12 +1913,14 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
                 'user_prompt': user_prompt_path,
                 'output_dir': output_dir,
                 'model': deployment_name,
+                'batch': batch,
+                'emails_per_call': emails_per_call,
                 'timestamp': datetime.now().isoformat()
             }
         }
 
         with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write(dump_json(report, indent=True))
 
         print(f"JSON report:       {report_path}")
 
@@ -903,12 +1931,13 @@ def process_emails(input_dir, system_prompt_path, user_prompt_path,
     print()
 
     return {
-        'processed': processed_count,
-        'matched': matched_count,
-        'rejected': rejected_count,
-        'failed': failed_count,
-        'tokens': total_input_tokens + total_output_tokens,
-        'cost': total_cost_usd,
+        'processed': state.processed,
+        'matched': state.matched,
+        'rejected': state.rejected,
+        'failed': state.failed,
+        'interrupted': interrupted,
+        'tokens': state.total_tokens,
+        'cost': state.cost_usd,
         'elapsed': elapsed
     }
 
@@ -1005,8 +2034,85 @@ Configuration:
         help='Show debug output including extracted reply text before sending to LLM'
     )
 
+    parser.add_argument(
+        '--body-chars',
+        type=int,
+        default=1500,
+        help='Characters of the immediate reply sent to the LLM (default: 1500)'
+    )
+
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=None,
+        help='Maximum number of concurrent LLM requests (default: LLM_CONCURRENCY from .env or 16)'
+    )
+
+    parser.add_argument(
+        '--emails-per-call',
+        type=int,
+        default=None,
+        help='Analyze N emails in one LLM call to save prompt tokens (default: LLM_EMAILS_PER_CALL from .env or 1)'
+    )
+
+    parser.add_argument(
+        '--cache',
+        default=None,
+        help=f'Response cache file (default: LLM_CACHE_PATH from .env or {DEFAULT_CACHE_PATH})'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the LLM, ignoring and not updating the response cache'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip emails already processed according to --log-file and append to it'
+    )
+
+    parser.add_argument(
+        '--copy-mode',
+        choices=['copy', 'hardlink'],
+        default='copy',
+        help='How EML files are placed in the output directories: copy, or hardlink '
+             '(no data copied; falls back to copy across filesystems) (default: copy)'
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream LLM answers and stop reading once the JSON is complete (token counts may be estimated)'
+    )
+
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Submit all emails as one Batch API job (half price, results within 24h)'
+    )
+
+    parser.add_argument(
+        '--prefilter',
+        default=None,
+        help='Keyword file; emails without any keyword are rejected without an LLM call'
+    )
+
+    parser.add_argument(
+        '--prefilter-max-chars',
+        type=int,
+        default=0,
+        help='Only prefilter emails whose immediate reply is shorter than N chars; '
+             'longer keyword-less emails still go to the LLM (default: 0 = any length)'
+    )
+
     args = parser.parse_args()
 
+    # Counters of this run (reported by the Ctrl+C handler)
+    state = RunState()
+    signal.signal(signal.SIGINT, partial(signal_handler, state))
+
     # Print header
     print("\n" + "=" * 80)
     print("LLM-BASED EMAIL FILTER v2.0")
@@ -1040,16 +2146,45 @@ Configuration:
         print(f"[ERROR] Not a file: {args.user_prompt}")
         sys.exit(1)
 
+    # Load keyword prefilter
+    prefilter = None
+    if args.prefilter:
+        keywords = load_prefilter_keywords(args.prefilter)
+        if not keywords:
+            print(f"[ERROR] No prefilter keywords loaded from: {args.prefilter}")
+            sys.exit(1)
+        prefilter = KeywordPrefilter(keywords)
+        engine = "Aho-Corasick" if HAS_AHOCORASICK else "regex"
+        print(f"[✓] Prefilter: {len(prefilter.keywords)} keywords from {args.prefilter} ({engine})")
+        if args.prefilter_max_chars:
+            print(f"[✓] Prefilter applies to replies shorter than {args.prefilter_max_chars} chars")
+    elif args.prefilter_max_chars:
+        print(f"[ERROR] --prefilter-max-chars requires --prefilter")
+        sys.exit(1)
+
     # Initialize Azure OpenAI
     print(f"\n[*] Loading configuration from .env...")
 
-    global openai_client, deployment_name, price_input, price_output, reasoning_effort, temperature
+    global openai_client, deployment_name, price_input, price_output, reasoning_effort, temperature, stream_responses
     openai_client, deployment_name, price_input, price_output, reasoning_effort, temperature = initialize_azure_openai()
 
     if not openai_client:
         print(f"[ERROR] Failed to initialize Azure OpenAI. Check .env configuration.")
         sys.exit(1)
 
+    stream_responses = args.stream
+
+    # Concurrency: CLI flag overrides LLM_CONCURRENCY (read after .env is loaded)
+    concurrency = args.concurrency or int(os.getenv('LLM_CONCURRENCY', '16'))
+    if concurrency < 1:
+        print(f"[ERROR] Concurrency must be at least 1")
+        sys.exit(1)
+
+    emails_per_call = args.emails_per_call or int(os.getenv('LLM_EMAILS_PER_CALL', '1'))
+    if emails_per_call < 1:
+        print(f"[ERROR] Emails per call must be at least 1")
+        sys.exit(1)
+
     # Run processing
     stats = process_emails(
         input_dir=args.input_dir,
@@ -1058,7 +2193,17 @@ Configuration:
         output_dir=args.output_dir,
         log_file=args.log_file,
         email_limit=args.email_limit,
-        debug=args.debug
+        debug=args.debug,
+        prefilter=prefilter,
+        prefilter_max_chars=args.prefilter_max_chars,
+        concurrency=concurrency,
+        batch=args.batch,
+        emails_per_call=emails_per_call,
+        resume=args.resume,
+        body_chars=args.body_chars,
+        hardlink=args.copy_mode == 'hardlink',
+        state=state,
+        cache_path=None if args.no_cache else os.path.expanduser(args.cache or os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH))
     )
 
     if stats is None:
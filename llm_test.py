@@ -37,6 +37,13 @@ except ImportError:
     print("Install with: pip install openai")
     sys.exit(1)
 
+# Optional: faster JSON parsing (falls back to stdlib json)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Test email example
 TEST_EMAIL = """From: jan.novak@firma.cz
 Date: Mon, 15 Jan 2024 10:30:00 +0100
@@ -53,7 +60,7 @@ Jan Novák"""
 SYSTEM_PROMPT = """You are an expert email analyzer. Determine if the email below is a genuine vacation/out-of-office response.
 
 Respond with JSON only:
-{"is_vacation_response": true/false, "confidence": 0.95, "reasoning": "brief explanation"}"""
+{"is_vacation_response": true/false, "confidence": 0.95, "reasoning": "max 20 words"}"""
 
 USER_PROMPT = """Analyze this email and determine if it's a genuine vacation auto-response or absence notification.
 
@@ -168,7 +175,8 @@ def test_llm_analysis(client, deployment):
                 {"role": "user", "content": USER_PROMPT + TEST_EMAIL}
             ],
             "response_format": {"type": "json_object"},
-            "max_completion_tokens": 500
+            # Short JSON answer; thinking models need headroom for reasoning tokens
+            "max_completion_tokens": 120 if reasoning_effort in ('', 'minimal') else 500
         }
 
         # Add temperature if set (thinking models like gpt-5-nano only support default)
@@ -186,7 +194,7 @@ def test_llm_analysis(client, deployment):
 
         # Extract response
         content = response.choices[0].message.content
-        result = json.loads(content)
+        result = orjson.loads(content) if HAS_ORJSON else json.loads(content)
 
         # Token usage
         input_tokens = response.usage.prompt_tokens
@@ -8,22 +8,28 @@ Author: Claude
 Version: 1.0
 """
 
-import mailbox
 import email
+import base64
 from email.header import decode_header
 from email.utils import parsedate_to_datetime
-from email.generator import BytesGenerator
 import re
+import unicodedata
 import argparse
 import os
 import sys
 import csv
 import signal
+import atexit
+import mmap
 import uuid
 from pathlib import Path
+from functools import lru_cache
 from datetime import datetime
 import time
 import mimetypes
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 # Try to import tqdm for progress bar
 try:
@@ -40,6 +46,21 @@ matched_count = 0
 failed_count = 0
 attachment_count = 0
 
+# Threads writing the attachments of one matched email in parallel
+ATTACHMENT_WRITERS = 4
+
+# Matched emails queued for the background writer before parsing waits
+MAX_PENDING_WRITES = 64
+
+# Messages handed to a parser process at a time (amortizes IPC overhead)
+SCAN_CHUNK_SIZE = 64
+
+# Failed-email messages printed together (one terminal write per batch)
+ERROR_PRINT_BATCH = 32
+
+# Base64 characters decoded per step when writing an attachment
+BASE64_SLICE_CHARS = 256 * 1024
+
 # =============================================================================
 # PROGRESS BAR
 # =============================================================================
@@ -47,6 +68,12 @@ attachment_count = 0
 class ProgressBar:
     """Simple progress bar for email processing."""
 
+    # Minimum seconds between redraws (each one is a flushed terminal write)
+    UPDATE_INTERVAL = 0.5
+
+    # The clock is only read every N calls (update runs once per email)
+    TIME_CHECK_EVERY = 16
+
     def __init__(self, total=None, enable=True):
         """
         Initialize progress bar.
@@ -58,6 +85,7 @@ class ProgressBar:
         self.total = total
         self.enable = enable
         self.last_update = 0
+        self.calls = 0
         self.start_time = time.time()
 
     def update(self, processed, matched, failed, attachments):
@@ -73,9 +101,14 @@ class ProgressBar:
         if not self.enable:
             return
 
-        # Update every email or every 0.1 seconds (whichever is less frequent)
+        # The first call always draws; after that only every TIME_CHECK_EVERY calls
+        self.calls += 1
+        if self.calls % self.TIME_CHECK_EVERY and self.calls > 1 and processed != self.total:
+            return
+
+        # Update every email or every UPDATE_INTERVAL seconds (whichever is less frequent)
         current_time = time.time()
-        if current_time - self.last_update < 0.1 and processed != self.total:
+        if current_time - self.last_update < self.UPDATE_INTERVAL and processed != self.total:
             return
 
         self.last_update = current_time
@@ -130,9 +163,23 @@ class ProgressBar:
 # TEXT NORMALIZATION
 # =============================================================================
 
+# Latin letters without a Unicode decomposition (NFKD keeps them as-is)
+NON_DECOMPOSABLE_TABLE = str.maketrans({
+    'ø': 'o', 'ß': 'ss', 'ł': 'l', 'đ': 'd', 'ħ': 'h',
+    'æ': 'ae', 'œ': 'oe', 'þ': 'th', 'ı': 'i'
+})
+
+# Combining diacritical marks left over after NFKD decomposition
+COMBINING_MARKS_RE = re.compile('[\u0300-\u036f]')
+
+@lru_cache(maxsize=8192)
 def normalize_text(text):
     """
-    Normalize text by removing diacritics and converting to lowercase ASCII.
+    Normalize text by removing diacritics and converting to lowercase.
+
+    Uses NFKD decomposition, so every accented Latin letter is folded
+    (Č, Ľ, Ŕ, ...); non-Latin scripts are kept. Cached since attachment
+    names such as image001.png repeat across emails.
 
     Args:
         text: Input text (may contain Czech/accented characters)
@@ -143,28 +190,12 @@ def normalize_text(text):
     if not text:
         return ""
 
-    # Mapping of diacritics to ASCII (Czech + common European)
-    replacements = {
-        'á': 'a', 'à': 'a', 'â': 'a', 'ä': 'a', 'ã': 'a', 'å': 'a',
-        'č': 'c', 'ç': 'c', 'ć': 'c',
-        'ď': 'd',
-        'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e', 'ě': 'e',
-        'í': 'i', 'ì': 'i', 'î': 'i', 'ï': 'i',
-        'ň': 'n', 'ñ': 'n',
-        'ó': 'o', 'ò': 'o', 'ô': 'o', 'ö': 'o', 'õ': 'o', 'ø': 'o',
-        'ř': 'r',
-        'š': 's', 'ś': 's',
-        'ť': 't',
-        'ú': 'u', 'ù': 'u', 'û': 'u', 'ü': 'u', 'ů': 'u',
-        'ý': 'y', 'ÿ': 'y',
-        'ž': 'z', 'ź': 'z', 'ż': 'z'
-    }
-
-    text = text.lower()
-    for accented, plain in replacements.items():
-        text = text.replace(accented, plain)
+    # Pure ASCII has nothing to fold (str.lower is a flat C loop)
+    if text.isascii():
+        return text.lower()
 
-    return text
+    decomposed = unicodedata.normalize('NFKD', text.lower().translate(NON_DECOMPOSABLE_TABLE))
+    return COMBINING_MARKS_RE.sub('', decomposed)
 
 # =============================================================================
 # HEADER DECODING
@@ -183,6 +214,27 @@ def decode_header_value(header_value):
     if not header_value:
         return ""
 
+    # Header objects (raw non-ASCII headers) are unhashable - skip the cache
+    if not isinstance(header_value, str):
+        return _decode_header_cached.__wrapped__(header_value)
+
+    # No encoded words - decode_header would return the value unchanged
+    if '=?' not in header_value:
+        return header_value
+
+    return _decode_header_cached(header_value)
+
+@lru_cache(maxsize=65536)
+def _decode_header_cached(header_value):
+    """
+    Decode header value; cached since subjects and senders repeat across emails.
+
+    Args:
+        header_value: Raw header value (non-empty)
+
+    Returns:
+        Decoded string
+    """
     try:
         decoded_parts = decode_header(header_value)
         result = []
@@ -208,6 +260,10 @@ def decode_header_value(header_value):
 # ATTACHMENT EXTRACTION
 # =============================================================================
 
+# Raw header check for a filename (Content-Disposition) or name (Content-Type)
+# parameter, including RFC 2231 forms such as filename*=
+NAME_PARAM_RE = re.compile(r'name\s*[*=]', re.IGNORECASE)
+
 def get_attachment_filename(part):
     """
     Extract filename from email part (handles both Content-Disposition and Content-Type).
@@ -226,9 +282,7 @@ def get_attachment_filename(part):
 
     # Try Content-Type name parameter (for inline attachments)
     if not filename:
-        content_type = part.get_content_type()
-        if part.get_param('name'):
-            filename = part.get_param('name')
+        filename = part.get_param('name') or None
 
     if not filename:
         return None
@@ -246,25 +300,68 @@ def get_attachment_filename(part):
     except:
         return str(filename) if filename else None
 
+# Base64 payloads decode to at least one byte if they contain any of these
+BASE64_CHAR_RE = re.compile('[A-Za-z0-9+/]')
+
+def part_has_payload(part):
+    """
+    Check that a part's decoded payload is not empty (base64 is not decoded).
+
+    Args:
+        part: email.message.Message part
+
+    Returns:
+        True if the part has payload bytes to save
+    """
+    if part.is_multipart():
+        return False
+
+    if str(part.get('content-transfer-encoding', '')).lower() == 'base64':
+        return BASE64_CHAR_RE.search(part.get_payload()) is not None
+
+    return bool(part.get_payload(decode=True))
+
 def extract_attachments(msg, pattern, case_sensitive=False):
     """
     Extract all attachments from email that match the regex pattern.
 
+    Payloads are not decoded here; save_attachments decodes them straight
+    into the output files.
+
     Args:
         msg: email.message.Message object
         pattern: Compiled regex pattern
         case_sensitive: Whether original matching was case-sensitive
 
     Returns:
-        List of tuples: (normalized_filename, original_filename, payload, content_type)
+        List of tuples: (normalized_filename, original_filename, part_index, content_type)
+        where part_index is the position of the part in msg.walk()
     """
     attachments = []
+    pattern_search = pattern.search
+    name_param_search = NAME_PARAM_RE.search
 
     try:
-        # Walk through all parts
-        for part in msg.walk():
+        # Walk through all parts (depth-first like msg.walk(), without
+        # one generator per nesting level)
+        part_index = -1
+        stack = [msg]
+        while stack:
+            part = stack.pop()
+            part_index += 1
+            if part.is_multipart():
+                stack.extend(reversed(part.get_payload()))
+
+            # Only parts with a name=/filename= parameter can have a filename
+            if not name_param_search(f"{part.get('Content-Disposition', '')};{part.get('Content-Type', '')}"):
+                continue
+
+            # Content-Type is parsed once per part (get_content_maintype()
+            # would parse it again)
+            content_type = part.get_content_type()
+
             # Skip multipart containers
-            if part.get_content_maintype() == 'multipart':
+            if content_type.startswith('multipart/'):
                 continue
 
             # Get filename
@@ -278,16 +375,14 @@ def extract_attachments(msg, pattern, case_sensitive=False):
             # Normalize filename for pattern matching
             normalized_filename = normalize_text(filename)
 
-            # Check if filename matches pattern
-            if pattern.search(normalized_filename):
-                # Get payload
-                payload = part.get_payload(decode=True)
-                if payload:
-                    content_type = part.get_content_type()
+            # Check if filename matches pattern (on str: normalized names keep
+            # non-Latin scripts, and a bytes pattern is no faster here)
+            if pattern_search(normalized_filename):
+                if part_has_payload(part):
                     attachments.append((
                         normalized_filename,
                         original_filename,
-                        payload,
+                        part_index,
                         content_type
                     ))
 
@@ -301,12 +396,15 @@ def extract_attachments(msg, pattern, case_sensitive=False):
 # EMAIL SAVING
 # =============================================================================
 
-def save_email_as_eml(msg, output_dir, uuid_str):
+def save_raw_eml(raw_msg, output_dir, uuid_str):
     """
-    Save email message as EML file.
+    Save the original bytes of an mbox message as EML file.
+
+    Only the mbox "From " separator line is dropped; headers and body are
+    written exactly as stored instead of being re-serialized.
 
     Args:
-        msg: email.message.Message object
+        raw_msg: Raw message bytes (one span of the mapped mbox)
         output_dir: Output directory
         uuid_str: UUID string for filename
 
@@ -317,21 +415,120 @@ def save_email_as_eml(msg, output_dir, uuid_str):
         filename = f"{uuid_str}.eml"
         filepath = os.path.join(output_dir, filename)
 
-        with open(filepath, 'wb') as f:
-            gen = BytesGenerator(f)
-            gen.flatten(msg)
+        newline = raw_msg.find(b'\n')
+        write_file(filepath, memoryview(raw_msg)[newline + 1:] if newline >= 0 else b'')
 
         return filename
     except Exception as e:
         print(f"[ERROR] Failed to save email: {e}")
         return None
 
-def save_attachment(payload, output_dir, uuid_str, counter, original_filename):
+def write_file(filepath, payload):
+    """
+    Write bytes to a new file with raw os calls (no Python file object).
+
+    Args:
+        filepath: Destination path (truncated if it exists)
+        payload: Bytes to write
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filepath, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def write_base64(fd, encoded):
+    """
+    Decode a base64 payload into an open file slice by slice.
+
+    Only clean base64 is handled (alphabet, line breaks, final padding);
+    anything else is left to the email package's lenient decoder.
+
+    Args:
+        fd: File descriptor opened for writing
+        encoded: Base64 payload string
+
+    Returns:
+        Number of bytes written, or None if the payload is not clean base64
+    """
+    carry = b''
+    padded = False
+    size = 0
+
+    for offset in range(0, len(encoded), BASE64_SLICE_CHARS):
+        try:
+            chunk = carry + encoded[offset:offset + BASE64_SLICE_CHARS].encode('ascii').translate(None, b' \t\r\n')
+        except UnicodeEncodeError:
+            return None
+
+        # Decode whole 4-character groups, the rest goes to the next slice
+        usable = len(chunk) - len(chunk) % 4
+        carry = chunk[usable:]
+        if not usable:
+            continue
+
+        # Padding is only allowed at the very end
+        if padded:
+            return None
+        padded = chunk[usable - 1] == 0x3d  # '='
+
+        try:
+            view = memoryview(base64.b64decode(chunk[:usable], validate=True))
+        except ValueError:
+            return None
+
+        size += len(view)
+        while view:
+            view = view[os.write(fd, view):]
+
+    if carry:
+        return None
+    return size
+
+def write_part_payload(filepath, part):
+    """
+    Write the decoded payload of an attachment part to a new file.
+
+    Base64 is decoded straight into the file, so the decoded attachment is
+    never held in memory as a whole; other encodings (and malformed base64)
+    are decoded by part.get_payload(decode=True).
+
+    Args:
+        filepath: Destination path (truncated if it exists)
+        part: email.message.Message part
+
+    Returns:
+        Number of bytes written
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filepath, flags, 0o644)
+    try:
+        size = None
+        if str(part.get('content-transfer-encoding', '')).lower() == 'base64':
+            size = write_base64(fd, part.get_payload())
+
+        if size is None:
+            # Start over with the full decoder
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            view = memoryview(part.get_payload(decode=True) or b'')
+            size = len(view)
+            while view:
+                view = view[os.write(fd, view):]
+
+        return size
+    finally:
+        os.close(fd)
+
+def save_attachment(part, output_dir, uuid_str, counter, original_filename):
     """
     Save attachment to file.
 
     Args:
-        payload: Attachment bytes
+        part: Attachment part (email.message.Message)
         output_dir: Output directory
         uuid_str: UUID string for filename
         counter: Attachment counter (1-indexed)
@@ -352,16 +549,65 @@ def save_attachment(payload, output_dir, uuid_str, counter, original_filename):
         filepath = os.path.join(output_dir, filename)
 
         # Save payload
-        with open(filepath, 'wb') as f:
-            f.write(payload)
-
-        file_size = len(payload)
+        file_size = write_part_payload(filepath, part)
         return (filename, file_size)
 
     except Exception as e:
         print(f"[ERROR] Failed to save attachment: {e}")
         return (None, 0)
 
+def save_attachments(msg, attachments, output_dir, uuid_str, executor=None):
+    """
+    Save all matching attachments of one email.
+
+    Args:
+        msg: email.message.Message object the attachments were extracted from
+        attachments: List from extract_attachments
+        output_dir: Output directory
+        uuid_str: UUID string for filenames
+        executor: ThreadPoolExecutor to write several attachments concurrently (optional)
+
+    Returns:
+        List of (saved_filename, file_size) tuples in attachment order
+        ((None, 0) for attachments that failed to save)
+    """
+    parts = list(msg.walk())
+    jobs = [(parts[part_index], output_dir, uuid_str, idx, orig_name)
+            for idx, (_, orig_name, part_index, _) in enumerate(attachments, start=1)]
+
+    if executor and len(jobs) > 1:
+        return list(executor.map(lambda job: save_attachment(*job), jobs))
+
+    return [save_attachment(*job) for job in jobs]
+
+def save_match(mbox_data, span, attachments, output_dir, uuid_str, executor=None):
+    """
+    Save a matched email and its matching attachments (runs in the writer thread).
+
+    The message is copied out of the mapped mbox only here, so queued
+    matches hold offsets rather than message bytes.
+
+    Args:
+        mbox_data: Mapped mbox from map_mbox
+        span: (start, end) offsets of the message (parsed here, off the main thread)
+        attachments: List from extract_attachments
+        output_dir: Output directory
+        uuid_str: UUID string for filenames
+        executor: ThreadPoolExecutor for concurrent attachment writes (optional)
+
+    Returns:
+        Tuple: (eml_filename, saved) - eml_filename is None if the email could
+        not be saved (attachments are skipped then), saved as from save_attachments
+    """
+    raw_msg = mbox_data[span[0]:span[1]]
+    eml_filename = save_raw_eml(raw_msg, output_dir, uuid_str)
+    if not eml_filename:
+        return None, []
+
+    msg = email.message_from_bytes(raw_msg)
+
+    return eml_filename, save_attachments(msg, attachments, output_dir, uuid_str, executor)
+
 # =============================================================================
 # CSV LOGGER
 # =============================================================================
@@ -369,6 +615,8 @@ def save_attachment(payload, output_dir, uuid_str, counter, original_filename):
 class CSVLogger:
     """CSV logger for extraction results."""
 
+    FLUSH_EVERY = 128
+
     def __init__(self, filepath):
         self.filepath = filepath
         self.fieldnames = [
@@ -386,21 +634,40 @@ class CSVLogger:
             'processing_time_ms'
         ]
 
-        # Create with headers if doesn't exist
-        if not os.path.exists(filepath):
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-                writer.writeheader()
+        # Headers only for a new file (existing logs are appended to)
+        is_new = not os.path.exists(filepath)
+
+        # One buffered handle for the whole run (flushed every FLUSH_EVERY rows)
+        self.rows_since_flush = 0
+        self.file = open(filepath, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+        # Rows are written as plain sequences in fieldnames order (same output
+        # as csv.DictWriter, without its per-row dict checks)
+        self.writer = csv.writer(self.file)
+
+        if is_new:
+            self.writer.writerow(self.fieldnames)
+            self.file.flush()
+
+        # Ctrl+C exits via sys.exit, which runs atexit hooks
+        atexit.register(self.close)
 
     def log(self, **kwargs):
         """Log a match to CSV."""
         try:
-            with open(self.filepath, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-                writer.writerow(kwargs)
+            self.writer.writerow([kwargs.get(name, '') for name in self.fieldnames])
+
+            self.rows_since_flush += 1
+            if self.rows_since_flush >= self.FLUSH_EVERY:
+                self.file.flush()
+                self.rows_since_flush = 0
         except Exception as e:
             print(f"[ERROR] Failed to write to log: {e}")
 
+    def close(self):
+        """Flush and close the log file."""
+        if not self.file.closed:
+            self.file.close()
+
 # =============================================================================
 # SIGNAL HANDLER (Ctrl+C)
 # =============================================================================
@@ -418,12 +685,142 @@ def signal_handler(sig, frame):
 # Register signal handler
 signal.signal(signal.SIGINT, signal_handler)
 
+# =============================================================================
+# MBOX READING
+# =============================================================================
+
+# Raw-bytes check for a Content-Disposition filename / Content-Type name
+# parameter (also matches RFC 2231 forms such as filename*=, name*0*=)
+ATTACHMENT_NAME_RE = re.compile(rb'name\s*[*=]', re.IGNORECASE)
+
+def map_mbox(mbox_path):
+    """
+    Map an mbox file into memory (read-only).
+
+    Args:
+        mbox_path: Path to mbox file
+
+    Returns:
+        mmap object (b'' for an empty file, which cannot be mapped)
+    """
+    with open(mbox_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Messages are read front to back - ask for aggressive readahead
+    # (madvise is not available on every platform)
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        data.madvise(mmap.MADV_SEQUENTIAL)
+
+    return data
+
+def iter_mbox_spans(data):
+    """
+    Yield the byte range of each message in a mapped mbox file.
+
+    Messages start at lines beginning with "From "; the blank separator
+    line before the next message is not included (like mailbox.mbox).
+    Only offsets are produced, so memory use does not depend on mbox size.
+
+    Args:
+        data: mmap (or bytes) from map_mbox
+
+    Yields:
+        Tuple: (start, end) offsets of the raw message
+        (including the "From " separator line)
+    """
+    # Content before the first "From " line is not a message
+    if data[:5] == b'From ':
+        start = 0
+    else:
+        start = data.find(b'\nFrom ')
+        if start < 0:
+            return
+        start += 1
+
+    while True:
+        separator = data.find(b'\nFrom ', start)
+        if separator < 0:
+            break
+        yield start, separator
+        start = separator + 1
+
+    end = len(data)
+    if data[end - 1:end] == b'\n':
+        end -= 1
+    yield start, end
+
+# =============================================================================
+# MESSAGE SCANNING (runs in parser processes)
+# =============================================================================
+
+# Per-process scanner state set by init_scanner: (mapped mbox, pattern, case_sensitive)
+_scanner = None
+
+def init_scanner(mbox_path, pattern, case_sensitive, worker=False):
+    """
+    Prepare the current process for scan_message.
+
+    Args:
+        mbox_path: Path to mbox file (mapped separately in each process)
+        pattern: Compiled regex pattern
+        case_sensitive: Whether matching is case-sensitive
+        worker: True in pool processes - Ctrl+C is then left to the main process
+    """
+    global _scanner
+
+    if worker:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    _scanner = (map_mbox(mbox_path), pattern, case_sensitive)
+
+def scan_message(span):
+    """
+    Parse one message and extract its matching attachments.
+
+    Args:
+        span: (start, end) offsets from iter_mbox_spans
+
+    Returns:
+        None if no attachment matches, otherwise a tuple
+        (span, row, attachments, error): row holds the CSV header fields and
+        attachments the list from extract_attachments; on failure row and
+        attachments are None and error is the message
+    """
+    data, pattern, case_sensitive = _scanner
+    raw_msg = data[span[0]:span[1]]
+
+    # Without any name=/filename= parameter no part can have a filename,
+    # so the full MIME parse is skipped
+    if not ATTACHMENT_NAME_RE.search(raw_msg):
+        return None
+
+    try:
+        msg = email.message_from_bytes(raw_msg)
+        attachments = extract_attachments(msg, pattern, case_sensitive)
+        if not attachments:
+            return None
+
+        row = dict(
+            date=msg.get('Date', ''),
+            from_address=msg.get('From', ''),
+            subject=decode_header_value(msg.get('Subject', '(No Subject)')),
+            message_id=msg.get('Message-ID', ''),
+            attachment_count=len(attachments)
+        )
+        return span, row, attachments, None
+
+    except Exception as e:
+        return span, None, None, str(e)
+
 # =============================================================================
 # MAIN PROCESSING FUNCTION
 # =============================================================================
 
 def process_mbox(mbox_path, pattern_str, output_dir, failed_dir, log_file,
-                 email_limit=None, dry_run=False, case_sensitive=False):
+                 email_limit=None, dry_run=False, case_sensitive=False, workers=1,
+                 quiet_errors=False):
     """
     Main processing function.
 
@@ -436,6 +833,8 @@ def process_mbox(mbox_path, pattern_str, output_dir, failed_dir, log_file,
         email_limit: Maximum emails to process (None = unlimited)
         dry_run: If True, only count matches without saving
         case_sensitive: If True, case-sensitive regex matching
+        workers: Number of parser processes (1 = parse in this process)
+        quiet_errors: If True, failed emails are only counted, not printed
 
     Returns:
         Statistics dict
@@ -462,9 +861,11 @@ def process_mbox(mbox_path, pattern_str, output_dir, failed_dir, log_file,
     # Open mbox file
     print(f"\n[*] Opening mbox file: {mbox_path}")
     try:
-        mbox = mailbox.mbox(mbox_path)
+        mbox_data = map_mbox(mbox_path)
     except Exception as e:
         print(f"[ERROR] Failed to open mbox file: {e}")
+        if csv_logger:
+            csv_logger.close()
         return None
 
     print(f"[*] Pattern: {pattern_str}")
@@ -474,6 +875,8 @@ def process_mbox(mbox_path, pattern_str, output_dir, failed_dir, log_file,
         print(f"[*] DRY RUN MODE - no files will be saved")
     if email_limit:
         print(f"[*] Email limit: {email_limit}")
+    if workers > 1:
+        print(f"[*] Parser processes: {workers}")
 
     print(f"\n[*] Processing emails...\n")
 
@@ -482,94 +885,152 @@ def process_mbox(mbox_path, pattern_str, output_dir, failed_dir, log_file,
     # Initialize progress bar (no total count - avoids pre-scanning entire mbox)
     progress = ProgressBar(total=None, enable=True)
 
-    # Process each email
-    for msg in mbox:
-        # Check email limit
-        if email_limit and processed_count >= email_limit:
-            progress.finish()
-            print(f"[*] Email limit ({email_limit}) reached. Stopping.")
-            break
+    # Messages are parsed and matched in parallel by worker processes (each maps
+    # the mbox itself, only offsets and matches cross process boundaries);
+    # results come back in mbox order. The pool is started before the writer
+    # threads exist so forked workers do not inherit them.
+    spans = iter_mbox_spans(mbox_data)
+    if email_limit:
+        spans = islice(spans, email_limit)
 
-        processed_count += 1
+    scan_pool = None
+    if workers > 1:
+        scan_pool = ProcessPoolExecutor(max_workers=workers, initializer=init_scanner,
+                                        initargs=(mbox_path, pattern, case_sensitive, True))
+        results = scan_pool.map(scan_message, spans, chunksize=SCAN_CHUNK_SIZE)
+    else:
+        init_scanner(mbox_path, pattern, case_sensitive)
+        results = map(scan_message, spans)
 
-        # Update progress bar
-        progress.update(processed_count, matched_count, failed_count, attachment_count)
+    # Attachment writes of one email run in parallel
+    writer_pool = ThreadPoolExecutor(max_workers=ATTACHMENT_WRITERS) if not dry_run else None
 
-        try:
-            # Extract attachments that match pattern
-            start_process_time = time.time()
-            attachments = extract_attachments(msg, pattern, case_sensitive)
+    # Matched emails are written by a background thread while the next emails
+    # are parsed; finished writes are logged in mbox order
+    save_pool = ThreadPoolExecutor(max_workers=1) if not dry_run else None
+    pending_saves = deque()
+
+    # Failed-email messages waiting to be printed
+    error_lines = []
+
+    def print_errors():
+        """Print the collected failed-email messages as one block."""
+        if error_lines:
+            print("\n" + '\n'.join(error_lines))
+            error_lines.clear()
+
+    def log_finished_saves(wait=False):
+        """Log queued matches whose files are written (all of them if wait=True)."""
+        global failed_count
+
+        while pending_saves and (wait or pending_saves[0][0].done()):
+            future, row, attachments, start_process_time = pending_saves.popleft()
+
+            try:
+                eml_filename, saved = future.result()
+            except Exception as e:
+                print(f"\n[ERROR] Failed to save email: {e}")
+                eml_filename, saved = None, []
 
-            if not attachments:
+            if not eml_filename:
+                failed_count += 1
                 continue
 
-            # === MATCH FOUND! ===
-            matched_count += 1
-            attachment_count += len(attachments)
+            attachment_filenames = []
+            attachment_sizes = []
+            attachment_types = []
+            total_size = 0
+
+            for (norm_name, orig_name, part_index, content_type), (att_filename, att_size) in zip(attachments, saved):
+                if att_filename:
+                    attachment_filenames.append(orig_name)
+                    attachment_sizes.append(str(att_size))
+                    attachment_types.append(content_type)
+                    total_size += att_size
+
+            # Log to CSV (processing time includes the background write)
+            csv_logger.log(
+                **row,
+                eml_filename=eml_filename,
+                attachment_names=' | '.join(attachment_filenames),
+                attachment_sizes=' | '.join(attachment_sizes),
+                attachment_types=' | '.join(attachment_types),
+                total_size_bytes=total_size,
+                processing_time_ms=int((time.time() - start_process_time) * 1000)
+            )
+
+    # Process each email (only matches and failures come back with data)
+    try:
+        for result in results:
+            processed_count += 1
 
-            if not dry_run:
-                # Generate UUID for this email
-                uuid_str = str(uuid.uuid4())
+            # Update progress bar
+            progress.update(processed_count, matched_count, failed_count, attachment_count)
 
-                # Save email as EML
-                eml_filename = save_email_as_eml(msg, output_dir, uuid_str)
+            # Log matches the writer thread has finished meanwhile
+            log_finished_saves()
 
-                if not eml_filename:
-                    failed_count += 1
-                    continue
+            if result is None:
+                continue
 
-                # Save all matching attachments
-                attachment_filenames = []
-                attachment_sizes = []
-                attachment_types = []
-                total_size = 0
-
-                for idx, (norm_name, orig_name, payload, content_type) in enumerate(attachments, start=1):
-                    att_filename, att_size = save_attachment(
-                        payload, output_dir, uuid_str, idx, orig_name
-                    )
-
-                    if att_filename:
-                        attachment_filenames.append(orig_name)
-                        attachment_sizes.append(str(att_size))
-                        attachment_types.append(content_type)
-                        total_size += att_size
-
-                # Calculate processing time
-                process_time_ms = int((time.time() - start_process_time) * 1000)
-
-                # Log to CSV
-                csv_logger.log(
-                    uuid=uuid_str,
-                    eml_filename=eml_filename,
-                    date=msg.get('Date', ''),
-                    from_address=msg.get('From', ''),
-                    subject=decode_header_value(msg.get('Subject', '(No Subject)')),
-                    message_id=msg.get('Message-ID', ''),
-                    attachment_count=len(attachments),
-                    attachment_names=' | '.join(attachment_filenames),
-                    attachment_sizes=' | '.join(attachment_sizes),
-                    attachment_types=' | '.join(attachment_types),
-                    total_size_bytes=total_size,
-                    processing_time_ms=process_time_ms
-                )
+            (start, end), row, attachments, error = result
+            start_process_time = time.time()
 
-        except Exception as e:
-            # Handle failed emails
-            failed_count += 1
+            if error is not None:
+                # Handle failed emails
+                failed_count += 1
 
-            print(f"\n[ERROR] Failed to process email #{processed_count}: {e}")
+                if not quiet_errors:
+                    error_lines.append(f"[ERROR] Failed to process email #{processed_count}: {error}")
+                    if len(error_lines) >= ERROR_PRINT_BATCH:
+                        print_errors()
 
-            if not dry_run:
-                # Try to save to failed directory
-                try:
-                    failed_uuid = str(uuid.uuid4())
-                    save_email_as_eml(msg, failed_dir, failed_uuid)
-                except:
-                    pass
+                if not dry_run:
+                    # Try to save to failed directory (original bytes, like matches)
+                    try:
+                        failed_uuid = str(uuid.uuid4())
+                        save_raw_eml(mbox_data[start:end], failed_dir, failed_uuid)
+                    except:
+                        pass
+                continue
 
-    # Close mbox
-    mbox.close()
+            # === MATCH FOUND! ===
+            matched_count += 1
+            attachment_count += len(attachments)
+
+            if not dry_run:
+                # Generate UUID for this email
+                uuid_str = str(uuid.uuid4())
+                row = dict(uuid=uuid_str, **row)
+
+                # Bound memory held by queued emails
+                if len(pending_saves) >= MAX_PENDING_WRITES:
+                    pending_saves[0][0].result()
+
+                # Save email as EML and all matching attachments (background)
+                future = save_pool.submit(save_match, mbox_data, (start, end), attachments,
+                                          output_dir, uuid_str, writer_pool)
+                pending_saves.append((future, row, attachments, start_process_time))
+
+    finally:
+        # Also reached on Ctrl+C: drop queued parse work instead of finishing it
+        if scan_pool:
+            scan_pool.shutdown(cancel_futures=True)
+        print_errors()
+
+    if email_limit and processed_count >= email_limit:
+        progress.finish()
+        print(f"[*] Email limit ({email_limit}) reached. Stopping.")
+
+    # Wait for queued writes, then close mbox, log and writers
+    log_finished_saves(wait=True)
+    if mbox_data:
+        mbox_data.close()
+    if csv_logger:
+        csv_logger.close()
+    if save_pool:
+        save_pool.shutdown()
+        writer_pool.shutdown()
 
     # Finish progress bar
     progress.finish()
@@ -621,21 +1082,35 @@ def find_mbox_files(input_path):
         return [str(input_path)]
 
     elif input_path.is_dir():
-        # Find all .mbox files in directory (non-recursive)
-        mbox_files = list(input_path.glob('*.mbox'))
-        # Also check for files without extension (common for mbox)
-        for item in input_path.iterdir():
-            if item.is_file() and item.suffix == '':
-                # Check if it looks like an mbox file (starts with "From ")
+        # Find all .mbox files in directory (non-recursive), plus files
+        # without extension (common for mbox) - one directory scan for both
+        mbox_files = []
+        candidates = []
+        with os.scandir(input_path) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith('.mbox'):
+                    mbox_files.append(entry.path)
+                elif Path(entry.name).suffix == '':
+                    candidates.append(entry)
+
+        for entry in candidates:
+            # Check if it looks like an mbox file (starts with "From ");
+            # only the first 5 bytes are read, however long the first line is
+            try:
+                if entry.stat().st_size < 5:
+                    continue
+                fd = os.open(entry.path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
                 try:
-                    with open(item, 'r', encoding='latin1', errors='ignore') as f:
-                        first_line = f.readline()
-                        if first_line.startswith('From '):
-                            mbox_files.append(item)
-                except:
-                    pass
+                    if os.read(fd, 5) == b'From ':
+                        mbox_files.append(entry.path)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
 
-        return [str(f) for f in mbox_files]
+        return mbox_files
 
     else:
         return []
@@ -685,6 +1160,9 @@ Examples:
   # Extract logo images (including inline attachments)
   python mbox_attachment_extractor.py --name "logo.*\\.png" --input archive.mbox --output ./results --log extraction.csv
 
+  # Limit parsing to 4 processes
+  python mbox_attachment_extractor.py --name "\\.pdf$" --input archive.mbox --output ./results --log extraction.csv --workers 4
+
 Note:
   - Attachment names are normalized to lowercase ASCII before regex matching (removes accents: č→c, ž→z, etc.)
   - Regex is case-insensitive by default (use --case-sensitive for exact case matching)
@@ -739,8 +1217,25 @@ Note:
         help='Use case-sensitive regex matching (default: case-insensitive)'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of parallel parser processes (default: CPU count)'
+    )
+
+    parser.add_argument(
+        '--quiet-errors',
+        action='store_true',
+        help='Do not print each failed email (the count is still reported)'
+    )
+
     args = parser.parse_args()
 
+    if args.workers is not None and args.workers < 1:
+        print("[ERROR] --workers must be at least 1")
+        sys.exit(1)
+
     # Validate input path
     if not os.path.exists(args.input):
         print(f"[ERROR] Input path not found: {args.input}")
@@ -792,7 +1287,9 @@ Note:
             log_file=args.log,
             email_limit=args.email_limit,
             dry_run=args.dry_run,
-            case_sensitive=args.case_sensitive
+            case_sensitive=args.case_sensitive,
+            workers=args.workers or os.cpu_count() or 1,
+            quiet_errors=args.quiet_errors
         )
 
         if stats is None: